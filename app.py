@@ -1,7 +1,17 @@
 import streamlit as st
-import pandas as pd
 import database as db
+import io
+import sqlite3
+import sys
 import time
+from contextlib import contextmanager
+
+# pandas, numpy and the modules built on them are imported where they are first
+# used, so the page header and filters render before they load. Under Pyodide
+# (stlite) importing pandas is the slowest step of a cold start.
+
+# Shown when a write gives up waiting on the lock held by a long import or simulation
+BUSY_MESSAGE = "The database is busy with another write. Try again in a moment."
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -97,23 +107,218 @@ def apply_custom_css():
 def init_app_state():
     if 'db_initialized' not in st.session_state:
         db.init_db()
+        db.warm_start()  # seeds players.csv into an empty database only
         st.session_state['db_initialized'] = True
 
+# --- Live Bidding ---
+def render_bidding():
+    import bidding
+    import pandas as pd
+    st.subheader("🔨 Live Bidding")
+    c1, c2 = st.columns([2, 1])
+    query = c1.text_input("Find Player", key="bid_search", placeholder="Name (Available players only)")
+    candidates, _ = db.fetch_players_page({'search': query, 'auction_status': ['Available']}, 'name', page_size=20)
+    if candidates.empty:
+        st.caption("No Available players match.")
+        return
+    players = candidates.set_index('id')
+    player_id = c1.selectbox("Player", players.index,
+                             format_func=lambda pid: f"{players.at[pid, 'name']} ({players.at[pid, 'role']})")
+    player = players.loc[player_id]
+    if player['current_bid']:
+        c2.metric("Leading Bid", f"₹{player['current_bid']} L", player['current_team'], delta_color="off")
+    else:
+        c2.metric("Base Price", f"₹{player['base_price']} L", "No bids yet", delta_color="off")
+
+    c3, c4, c5, c6 = st.columns([2, 1, 1, 1])
+    team = c3.text_input("Team", key="bid_team")
+    opening = max(int(player['base_price']), int(player['current_bid']) + 5)
+    amount = c4.number_input("Bid (Lakhs)", min_value=1, value=opening, step=5,
+                             key=f"bid_amount_{player_id}_{player['current_bid']}")
+    c5.write("")
+    c6.write("")
+    if c5.button("Place Bid", type="primary"):
+        try:
+            result = bidding.place_bid(player_id, team, amount)
+        except ValueError as e:
+            st.error(str(e))
+        except sqlite3.OperationalError:
+            st.error(BUSY_MESSAGE)
+        else:
+            if result['accepted']:
+                st.rerun()
+            st.warning(result['reason'])
+    if c6.button("Close Bidding"):
+        try:
+            status, price = bidding.close_bidding(player_id)
+        except sqlite3.OperationalError:
+            st.error(BUSY_MESSAGE)
+        else:
+            st.success(f"{player['name']}: {status}" + (f" to {player['current_team']} for ₹{price} L" if price else ""))
+
+    history = bidding.bid_history(player_id)
+    if not history.empty:
+        history['placed_at'] = pd.to_datetime(history['placed_at'], unit='s')
+        st.dataframe(history, use_container_width=True, hide_index=True)
+
+# --- Seasons ---
+CURRENT_AUCTION = "Current auction"
+
+@contextmanager
+def season_selector():
+    """Renders the season picker and routes the block's database calls to the chosen auction."""
+    seasons = db.list_auctions()
+    season = CURRENT_AUCTION
+    if seasons:
+        season = st.selectbox("Season", [CURRENT_AUCTION] + seasons,
+                              help="Archived auctions are read from their own database files.")
+    if season == CURRENT_AUCTION:
+        yield season
+    else:
+        with db.use_auction(season):
+            yield season
+
+def render_across_seasons():
+    import cross_auction
+    st.subheader("📅 Across Seasons")
+    seasons = db.list_auctions()
+    if not seasons:
+        st.caption("Archive an auction under Admin & Import to compare seasons here.")
+        return
+    chosen = st.multiselect("Seasons", seasons, default=seasons[-5:])
+    if not chosen:
+        return
+    prices = cross_auction.role_prices(chosen)
+    by_auction = prices['by_auction']
+    st.caption("Average final price by role")
+    st.line_chart(by_auction.pivot(index='auction', columns='role', values='avg_price'))
+    st.dataframe(
+        prices['overall'],
+        use_container_width=True,
+        column_config={
+            "role": "Role",
+            "players": "Players",
+            "total_base_price": None,
+            "max_rating": "Top Rating",
+            "sold": "Sold",
+            "unsold": "Unsold",
+            "total_spend": st.column_config.NumberColumn("Total Spend", format="₹%d L"),
+            "avg_price": st.column_config.NumberColumn("Avg Price", format="₹%.1f L"),
+            "avg_base_price": st.column_config.NumberColumn("Avg Base", format="₹%.1f L"),
+        },
+        hide_index=True
+    )
+    names = st.text_input("Price trajectory for players", placeholder="Comma-separated names, e.g. Virat Kohli")
+    names = [name.strip() for name in names.split(",") if name.strip()]
+    if names:
+        trajectories = cross_auction.price_trajectories(names, chosen)
+        if trajectories.empty:
+            st.info("None of those players appear in the chosen seasons.")
+        else:
+            label = trajectories['name'] + " (" + trajectories['nationality'] + ")"
+            st.line_chart(trajectories.assign(player=label).pivot(index='auction', columns='player',
+                                                                 values='final_price'))
+            st.dataframe(trajectories, use_container_width=True, hide_index=True)
+
+# --- Parquet Export ---
+def export_button(label, key, version, write, file_name):
+    """
+    Writes a Parquet file with write(buffer) when asked and offers it for
+    download until version (e.g. the filters it was built for) changes.
+    Hidden when pyarrow is not installed.
+    """
+    if not db.columnar_supported():
+        return
+    c1, c2 = st.columns([1, 1])
+    if c1.button(label, key=f"{key}_build"):
+        buffer = io.BytesIO()
+        write(buffer)
+        st.session_state[key] = (version, buffer.getvalue())
+    built = st.session_state.get(key)
+    if built and built[0] == version:
+        c2.download_button("⬇️ Download", built[1], file_name=file_name,
+                           mime="application/vnd.apache.parquet", key=f"{key}_download")
+
+# --- Background Jobs ---
+JOB_POLL_SECONDS = 1.0
+JOB_LABELS = {'simulate_auction': "Auction Simulation", 'bulk_import': "Bulk Import"}
+
+def track_job(job_id):
+    st.session_state.setdefault('my_jobs', []).append(job_id)
+
+def render_jobs():
+    import jobs
+    st.subheader("🧵 Background Jobs")
+    recent = jobs.list_jobs(limit=10)
+    if recent.empty:
+        st.caption("No jobs yet. Imports and simulations run here without blocking the app.")
+        return
+    for job in recent.itertuples():
+        label = f"#{job.id} {JOB_LABELS.get(job.kind, job.kind)}"
+        if job.status in ('queued', 'running'):
+            c1, c2 = st.columns([4, 1])
+            text = "Cancelling..." if job.cancel_requested else f"{label}: {job.message or job.status}"
+            c1.progress(job.progress, text=text)
+            c2.button("Cancel", key=f"cancel_job_{job.id}", on_click=jobs.cancel, args=(job.id,),
+                      disabled=job.cancel_requested)
+        elif job.status == 'done':
+            st.success(f"{label}: {job.message or 'done'}")
+        elif job.status == 'failed':
+            st.error(f"{label} failed: {job.error}")
+        else:
+            st.warning(f"{label} cancelled; nothing was changed.")
+
+def poll_jobs():
+    """Reruns the script until this session's jobs finish, so their progress stays live."""
+    mine = st.session_state.get('my_jobs', [])
+    if not mine:
+        return
+    import jobs
+    tracked = [job for job in map(jobs.get_job, mine) if job is not None]
+    running = [job['id'] for job in tracked if job['status'] in ('queued', 'running')]
+    if any(job['status'] == 'done' and job['kind'] == 'simulate_auction' for job in tracked):
+        st.balloons()
+    st.session_state['my_jobs'] = running
+    if running:
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
 # --- Main App ---
 def main():
     apply_custom_css()
     init_app_state()
 
+    with st.sidebar:
+        st.markdown("### ⚙️ Settings")
+        use_snapshot = st.checkbox(
+            "In-memory filtering", value=False,
+            help="Filter Player Discovery against a compact in-memory copy of the registry. "
+                 "The copy is rebuilt automatically after every change."
+        )
+        st.checkbox(
+            "Record performance", value=db.profiling_enabled(), key="record_performance",
+            on_change=lambda: db.enable_profiling(st.session_state['record_performance']),
+            help="Time every database call and tab render. Results appear under Admin & Import."
+        )
+        if sys.platform != "emscripten":  # one thread under Pyodide: reads never overlap a write
+            st.checkbox(
+                "Read from a snapshot", value=db.replica_enabled(), key="read_replica",
+                on_change=lambda: db.enable_replica(st.session_state['read_replica']),
+                help="Serve the dashboard from an in-memory copy of the database, so a long simulation "
+                     f"or import never holds it up. Shows writes within {db.REPLICA_MAX_STALENESS:g} s."
+            )
+
     st.title("🏆 PRO Cricket Auction Dashboard")
     st.markdown("**Scouting | Analytics | Simulation**")
     
     # --- Tabs ---
-    tab1, tab2, tab3 = st.tabs(["🔍 Player Discovery", "📊 Analytics Hub", "🛠️ Admin & Import"])
+    tab1, tab2, tab3, tab4 = st.tabs(["🔍 Player Discovery", "📊 Analytics Hub", "🧩 Squad Builder",
+                                      "🛠️ Admin & Import"])
 
     # ==========================
     # TAB 1: PLAYER DISCOVERY
     # ==========================
-    with tab1:
+    with tab1, db.profile_section("tab:discovery"):
         st.header("Player Scout Registry")
         
         # Filters in Expander (Main area to save Sidebar for Global controls or clean look)
@@ -130,16 +335,53 @@ def main():
                 nationalities = st.multiselect("Nationality", nat_opts)
             with col_f4:
                 min_price, max_price = st.slider("Base Price (Lakhs)", 20, 200, (20, 200), step=10)
+            col_f5, col_f6 = st.columns(2)
+            with col_f5:
+                min_skill_pct = st.slider("Min Rating Percentile (within role)", 0, 100, 0, step=5)
+            with col_f6:
+                min_value = st.number_input("Min Value Score", min_value=0.0, value=0.0, step=0.1,
+                                            help="Rating percentile points per lakh of base price, within role.")
         
+        # Sorting & Paging
+        SORT_LABELS = {"id": "Registration Order", "name": "Name", "base_price": "Base Price", "skill_rating": "Rating",
+                       "strike_rate_pct": "Strike Rate Percentile", "economy_rate_pct": "Economy Percentile",
+                       "skill_rating_pct": "Rating Percentile", "base_price_pct": "Base Price Percentile",
+                       "value_score": "Value Score"}
+        col_s1, col_s2, col_s3 = st.columns([2, 1, 1])
+        with col_s1:
+            sort_by = st.selectbox("Sort By", db.SORT_COLUMNS, format_func=SORT_LABELS.get)
+        with col_s2:
+            page_size = st.selectbox("Rows per Page", [25, 50, 100], index=1)
+        with col_s3:
+            st.write("")
+            descending = st.checkbox("Descending")
+
         # Fetch Data
         filters = {
             'search': search_text,
             'role': roles,
             'nationality': nationalities,
             'price_min': min_price,
-            'price_max': max_price
+            'price_max': max_price,
+            'skill_rating_pct_min': min_skill_pct / 100 if min_skill_pct else None,
+            'value_score_min': min_value or None,
         }
-        df = db.fetch_players(filters)
+        if use_snapshot:
+            import player_store as source
+        else:
+            source = db
+        total = source.count_players(filters)
+
+        # Keyset paging: keep the cursor of every page visited so Prev can step back.
+        # Any change to filters or sort starts again from the first page.
+        page_key = repr((sorted(filters.items()), sort_by, descending, page_size, use_snapshot))
+        if st.session_state.get('page_key') != page_key:
+            st.session_state['page_key'] = page_key
+            st.session_state['page_cursors'] = [None]
+        cursors = st.session_state['page_cursors']
+        df, next_cursor = source.fetch_players_page(filters, sort_by, descending, page_size, cursors[-1])
+        import pricing
+        df = pricing.with_fair_value(df)
 
         # Display Data
         if not df.empty:
@@ -156,19 +398,99 @@ def main():
                     "auction_status": st.column_config.SelectboxColumn("Status", options=["Available", "Sold", "Unsold"], disabled=True),
                     "strike_rate": st.column_config.NumberColumn("SR", format="%.2f"),
                     "economy_rate": st.column_config.NumberColumn("Econ", format="%.2f"),
+                    "strike_rate_pct": st.column_config.ProgressColumn("SR %ile", min_value=0, max_value=1, format="%.2f"),
+                    "economy_rate_pct": st.column_config.ProgressColumn("Econ %ile", min_value=0, max_value=1, format="%.2f"),
+                    "skill_rating_pct": st.column_config.ProgressColumn("Rating %ile", min_value=0, max_value=1, format="%.2f"),
+                    "base_price_pct": st.column_config.ProgressColumn("Price %ile", min_value=0, max_value=1, format="%.2f"),
+                    "value_score": st.column_config.NumberColumn("Value", format="%.2f",
+                                                                 help="Rating percentile points per lakh, within role"),
+                    "predicted_price": st.column_config.NumberColumn(
+                        "Fair Price", format="₹%.0f L",
+                        help="Expected sale price for the player's role, nationality and stats, fitted on every sale so far"),
+                    "value_gap": st.column_config.NumberColumn(
+                        "Over/Under", format="₹%.0f L",
+                        help="Sold price (base price if not sold) minus fair price: above zero is overpriced"),
                     "id": None
                 },
                 hide_index=True,
                 height=500
             )
-            st.caption(f"Showing {len(df)} players")
+            first_row = (len(cursors) - 1) * page_size + 1
+            col_p1, col_p2, col_p3 = st.columns([1, 4, 1])
+            col_p1.button("◀ Prev", disabled=len(cursors) == 1, on_click=cursors.pop)
+            col_p2.caption(f"Showing {first_row}–{first_row + len(df) - 1} of {total} players")
+            col_p3.button("Next ▶", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,))
+            export_button(f"Export {total:,} players to Parquet", "export_players", (page_key, db.write_generation()),
+                          lambda buffer: db.export_players(buffer, filters), "players.parquet")
+
+            model = pricing.get_model()
+            if not model.ready:
+                st.caption("Fair prices appear once enough players have been sold.")
+            else:
+                st.caption(f"Fair prices: a regression over {model.sales:,} sales (R² {model.r_squared():.2f}).")
+                if st.checkbox("Show best value available", help="Available players whose base price sits "
+                                                                  "furthest below their fair price"):
+                    bargains = pricing.score_available(filters).head(10)
+                    if bargains.empty:
+                        st.caption("No Available players match the filters.")
+                    else:
+                        st.dataframe(
+                            bargains[['name', 'role', 'nationality', 'skill_rating', 'base_price', 'predicted_price',
+                                      'value_gap']],
+                            use_container_width=True,
+                            column_config={
+                                "name": "Player",
+                                "role": "Role",
+                                "nationality": "Nation",
+                                "skill_rating": st.column_config.NumberColumn("Rating", format="%d/10"),
+                                "base_price": st.column_config.NumberColumn("Base (L)", format="₹%d L"),
+                                "predicted_price": st.column_config.NumberColumn("Fair Price", format="₹%.0f L"),
+                                "value_gap": st.column_config.NumberColumn("Over/Under", format="₹%.0f L"),
+                            },
+                            hide_index=True,
+                        )
+
+            st.subheader("🧬 Similar Players")
+            col_k1, col_k2, col_k3 = st.columns([3, 1, 1])
+            names = dict(zip(df['id'], df['name']))
+            target = col_k1.selectbox("Find players like", list(names), format_func=names.get)
+            n_similar = col_k2.number_input("How many", 1, 50, 5)
+            with col_k3:
+                st.write("")
+                similar_available = st.checkbox("Only Available", value=True, key="similar_available")
+            import similarity
+            similar = similarity.similar_players(int(target), int(n_similar),
+                                                 {'auction_status': ['Available']} if similar_available else None)
+            if not similar.empty:
+                st.dataframe(
+                    similar[['name', 'role', 'nationality', 'age', 'matches_played', 'strike_rate', 'economy_rate',
+                             'skill_rating', 'base_price', 'auction_status', 'distance']],
+                    use_container_width=True,
+                    column_config={
+                        "name": "Player",
+                        "nationality": "Nation",
+                        "role": "Role",
+                        "age": "Age",
+                        "matches_played": "Matches",
+                        "strike_rate": st.column_config.NumberColumn("SR", format="%.2f"),
+                        "economy_rate": st.column_config.NumberColumn("Econ", format="%.2f"),
+                        "skill_rating": st.column_config.NumberColumn("Rating", format="%d/10"),
+                        "base_price": st.column_config.NumberColumn("Base (L)", format="₹%d L"),
+                        "auction_status": "Status",
+                        "distance": st.column_config.NumberColumn("Distance", format="%.2f",
+                                                                  help="Stat-line distance; 0 is identical"),
+                    },
+                    hide_index=True
+                )
+            else:
+                st.info("No comparable players match. Untick Only Available to include sold players.")
         else:
             st.warning("No players found matching criteria.")
 
     # ==========================
     # TAB 2: ANALYTICS
     # ==========================
-    with tab2:
+    with tab2, db.profile_section("tab:analytics"), season_selector() as season:
         st.header("Auction Analytics")
         
         stats = db.get_stats()
@@ -178,6 +500,8 @@ def main():
         m1.metric("Total Players", stats.get('total_players', 0))
         m2.metric("Avg Base Price", f"₹{stats.get('avg_price', 0):.1f} L")
         m3.metric("Highest Rating", f"{stats.get('max_rating', 'N/A')}/10")
+        m4.metric("Total Spend", f"₹{stats.get('total_spend', 0):,} L",
+                  help=f"{stats.get('sold_count', 0)} sold / {stats.get('unsold_count', 0)} unsold")
         
         # Charts
         st.divider()
@@ -185,7 +509,7 @@ def main():
         
         with col_c1:
             st.subheader("Role Distribution")
-            role_data = stats.get('role_dist', pd.DataFrame())
+            role_data = stats['role_dist']
             if not role_data.empty:
                 st.bar_chart(role_data.set_index('role'))
             else:
@@ -193,16 +517,204 @@ def main():
 
         with col_c2:
             st.subheader("Price vs Rating Scatter")
-            # Fetch raw data for scatter
-            all_df = db.fetch_players()
-            if not all_df.empty:
-                # Simple scatter using st.scatter_chart (new in recent Streamlit) or generic chart
-                st.scatter_chart(all_df, x='skill_rating', y='base_price', color='role')
+            # Aggregated in SQLite so the chart stays a few hundred points at any registry size
+            scatter_mode = st.radio("Show", ["Binned Density", "Sampled Players"], horizontal=True,
+                                    label_visibility="collapsed")
+            if scatter_mode == "Binned Density":
+                bins_df = db.price_rating_bins(price_bin_size=10)
+                if not bins_df.empty:
+                    st.scatter_chart(bins_df, x='skill_rating', y='price_bucket', color='role', size='count')
+            else:
+                sample_size = st.slider("Sample Size", 100, 2000, 500, step=100)
+                sample_df = db.sample_players(size=sample_size)
+                if not sample_df.empty:
+                    st.scatter_chart(sample_df, x='skill_rating', y='base_price', color='role')
+
+        st.subheader("Auction Outcomes by Role")
+        role_summary = stats['role_summary']
+        if not role_summary.empty:
+            st.dataframe(
+                role_summary,
+                use_container_width=True,
+                column_config={
+                    "role": "Role",
+                    "player_count": "Players",
+                    "total_base_price": None,
+                    "max_rating": "Top Rating",
+                    "sold_count": "Sold",
+                    "unsold_count": "Unsold",
+                    "total_spend": st.column_config.NumberColumn("Total Spend", format="₹%d L"),
+                },
+                hide_index=True
+            )
+
+        st.subheader("🕰️ Round over Round")
+        import auction_history
+        export_button("Export auction history to Parquet", "export_outcomes", db.write_generation(),
+                      db.export_auction_outcomes, "auction_history.parquet")
+        rounds = auction_history.auction_rounds()['round'].tolist()
+        if len(rounds) < 2:
+            st.caption("Every auction outcome is kept. Reset and re-run the auction to compare rounds.")
+        else:
+            col_r1, col_r2 = st.columns(2)
+            round_a = col_r1.selectbox("From round", rounds, index=len(rounds) - 2)
+            round_b = col_r2.selectbox("To round", rounds, index=len(rounds) - 1)
+            comparison = auction_history.compare_rounds(round_a, round_b)
+            roles = comparison['roles']
+            d1, d2, d3 = st.columns(3)
+            d1.metric("Total Spend", f"₹{roles['spend_b'].sum():,} L",
+                      delta=f"{roles['spend_change'].sum():+,} L")
+            d2.metric("Sold", int(roles['sold_b'].sum()), delta=int(roles['sold_change'].sum()))
+            d3.metric("Players Changed", f"{len(comparison['players']):,}")
+            st.dataframe(
+                roles,
+                use_container_width=True,
+                column_config={
+                    "role": "Role",
+                    "sold_a": f"Sold (R{round_a})",
+                    "sold_b": f"Sold (R{round_b})",
+                    "unsold_a": None,
+                    "unsold_b": None,
+                    "spend_a": st.column_config.NumberColumn(f"Spend (R{round_a})", format="₹%d L"),
+                    "spend_b": st.column_config.NumberColumn(f"Spend (R{round_b})", format="₹%d L"),
+                    "sold_change": "Sold Δ",
+                    "spend_change": st.column_config.NumberColumn("Spend Δ", format="₹%d L"),
+                },
+                hide_index=True
+            )
+            st.caption("Biggest price swings")
+            st.dataframe(
+                comparison['players'].head(100),
+                use_container_width=True,
+                column_config={
+                    "id": None,
+                    "name": "Player",
+                    "role": "Role",
+                    "nationality": None,
+                    "base_price": None,
+                    "skill_rating": st.column_config.NumberColumn("Rating", format="%d/10"),
+                    "auction_status_a": f"R{round_a}",
+                    "final_price_a": st.column_config.NumberColumn(f"Price (R{round_a})", format="₹%d L"),
+                    "auction_status_b": f"R{round_b}",
+                    "final_price_b": st.column_config.NumberColumn(f"Price (R{round_b})", format="₹%d L"),
+                    "price_change": st.column_config.NumberColumn("Δ", format="₹%d L"),
+                },
+                hide_index=True
+            )
+
+        st.divider()
+        st.subheader("🎲 Monte Carlo Price Forecast")
+        st.markdown("Simulate many auctions over the Available players. No player data is changed.")
+        col_mc1, col_mc2 = st.columns([1, 3])
+        with col_mc1:
+            iterations = st.number_input("Auctions to simulate", 100, 20000, 1000, step=100)
+            if st.button("Run Forecast"):
+                with st.spinner(f"Simulating {iterations:,} auctions..."):
+                    import monte_carlo as mc
+                    st.session_state['forecast'] = mc.run_monte_carlo(iterations=int(iterations))
+                    st.session_state['forecast_season'] = season
+
+        forecast = st.session_state.get('forecast')
+        if st.session_state.get('forecast_season') != season:
+            forecast = None  # run against another season's players
+        if forecast and forecast['iterations']:
+            with col_mc2:
+                st.caption(f"Expected spend per role over {forecast['iterations']:,} auctions")
+                st.bar_chart(forecast['role_spend'].set_index('role'))
+            st.dataframe(
+                forecast['players'],
+                use_container_width=True,
+                column_config={
+                    "id": None,
+                    "name": "Player",
+                    "nationality": "Nation",
+                    "role": "Role",
+                    "base_price": st.column_config.NumberColumn("Base (L)", format="₹%d L"),
+                    "skill_rating": st.column_config.NumberColumn("Rating", format="%d/10"),
+                    "sell_probability": st.column_config.ProgressColumn("Sell Chance", min_value=0, max_value=1, format="%.2f"),
+                    "mean_price": st.column_config.NumberColumn("Mean Price", format="₹%.0f L"),
+                    "p10_price": st.column_config.NumberColumn("P10", format="₹%d L"),
+                    "p50_price": st.column_config.NumberColumn("Median", format="₹%d L"),
+                    "p90_price": st.column_config.NumberColumn("P90", format="₹%d L"),
+                },
+                hide_index=True,
+                height=400
+            )
+        elif forecast is not None:
+            st.info("No Available players to forecast. Reset the auction first.")
+
+        st.divider()
+        render_across_seasons()
     
     # ==========================
-    # TAB 3: ADMIN & IMPORT
+    # TAB 3: SQUAD BUILDER
     # ==========================
-    with tab3:
+    with tab3, db.profile_section("tab:squad"):
+        st.header("Squad Builder")
+        st.markdown("The highest-rated squad that fits the purse and the team rules.")
+
+        c1, c2, c3, c4, c5 = st.columns(5)
+        purse = c1.number_input("Purse (Lakhs)", 100, 100_000, 2000, step=100)
+        squad_size = c2.slider("Squad Size", 11, 25, 11)
+        min_bowlers = c3.slider("Min Bowlers", 0, 10, 4)
+        min_keepers = c4.slider("Min Keepers", 0, 3, 1)
+        max_overseas = c5.slider("Max Overseas", 0, 10, 4)
+
+        c6, c7 = st.columns(2)
+        forecast = st.session_state.get('forecast')
+        if st.session_state.get('forecast_season') != CURRENT_AUCTION:
+            forecast = None
+        price_basis = c6.radio(
+            "Price Players At", ["Base Price", "Forecast Mean Price"], horizontal=True,
+            disabled=forecast is None or forecast['iterations'] == 0,
+            help="Run a Monte Carlo forecast in the Analytics Hub to price players at their expected sale price."
+        )
+        only_available = c7.checkbox("Only Available players", value=True)
+
+        candidates = db.fetch_players({'auction_status': ['Available']} if only_available else None)
+        price_col = 'base_price'
+        if price_basis == "Forecast Mean Price" and forecast is not None and forecast['iterations']:
+            expected = forecast['players'][['id', 'mean_price']]
+            candidates = candidates.merge(expected, on='id', how='left')
+            # Never sold in the forecast: fall back to the base price
+            candidates['expected_price'] = candidates['mean_price'].fillna(candidates['base_price']).round()
+            price_col = 'expected_price'
+
+        if min_bowlers + min_keepers > squad_size:
+            st.error("Minimum bowlers and keepers exceed the squad size.")
+        else:
+            import squad_optimizer
+            start = time.perf_counter()
+            best = squad_optimizer.optimize_squad(
+                candidates, purse, squad_size, min_bowlers, min_keepers, max_overseas, price_col=price_col
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if best['squad'] is None:
+                st.warning("No squad satisfies these rules within the purse.")
+            else:
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Total Rating", best['total_rating'])
+                m2.metric("Squad Cost", f"₹{best['total_cost']:,.0f} L")
+                m3.metric("Purse Left", f"₹{purse - best['total_cost']:,.0f} L")
+                m4.metric("Solved In", f"{elapsed_ms:.0f} ms", best['method'].title(), delta_color="off")
+                st.dataframe(
+                    best['squad'][['name', 'role', 'nationality', 'skill_rating', price_col]],
+                    use_container_width=True,
+                    column_config={
+                        "name": "Player",
+                        "nationality": "Nation",
+                        "skill_rating": st.column_config.ProgressColumn("Rating", min_value=1, max_value=10, format="%d/10"),
+                        price_col: st.column_config.NumberColumn("Price", format="₹%d L"),
+                    },
+                    hide_index=True,
+                )
+                st.caption(f"Chosen from {best['candidates']:,} candidates left after pruning "
+                           f"{len(candidates):,} dominated or surplus players.")
+
+    # ==========================
+    # TAB 4: ADMIN & IMPORT
+    # ==========================
+    with tab4, db.profile_section("tab:admin"):
         st.header("Admin Control Panel")
         
         col_admin1, col_admin2 = st.columns([1, 1], gap="large")
@@ -232,36 +744,97 @@ def main():
                         "matches_played": matches, "strike_rate": sr, "economy_rate": econ,
                         "base_price": base, "skill_rating": rating
                     }
-                    db.add_player(player_data)
-                    st.success(f"Added {name}!")
+                    try:
+                        db.add_player(player_data)
+                        st.success(f"Added {name}!")
+                    except ValueError as e:
+                        st.error(f"{e}. Re-upload them through Bulk Import to update their profile.")
+                    except sqlite3.OperationalError:
+                        st.error(BUSY_MESSAGE)
 
         # Import & Simulate
         with col_admin2:
             st.subheader("📂 Bulk Import")
-            uploaded_file = st.file_uploader("Upload CSV", type=['csv'])
+            columnar = db.columnar_supported()
+            uploaded_file = st.file_uploader(
+                "Upload CSV, Parquet or Arrow" if columnar else "Upload CSV",
+                type=['csv'] + (['parquet', 'arrow', 'feather'] if columnar else []),
+                help="Players already registered (same name and nationality) are updated, not duplicated."
+            )
             if uploaded_file:
                 if st.button("Import Data"):
+                    import jobs
                     try:
-                        csv_df = pd.read_csv(uploaded_file)
-                        db.bulk_import(csv_df)
-                        st.success("Data Imported Successfully!")
-                    except Exception as e:
-                        st.error(f"Import Failed: {e}")
+                        # Hand the job its own copy: the upload widget may be cleared before it finishes
+                        track_job(jobs.submit_import(io.BytesIO(uploaded_file.getvalue())))
+                        st.info("Import started. Follow it under Background Jobs.")
+                    except sqlite3.OperationalError:
+                        st.error(BUSY_MESSAGE)
             
             st.divider()
             
             st.subheader("⚡ Auction Simulator")
             st.markdown("Randomly assign Sold/Unsold status and Final Price to available players.")
             if st.button("RUN SIMULATION", type="primary"):
-                with st.spinner("Simulating Auction..."):
-                    time.sleep(1) # Dramatic pause
-                    count = db.simulate_auction()
-                st.success(f"Simulation Complete! Updated {count} players.")
-                st.balloons()
+                import jobs
+                try:
+                    track_job(jobs.submit_simulation())
+                    st.info("Simulation started. Follow it under Background Jobs.")
+                except sqlite3.OperationalError:
+                    st.error(BUSY_MESSAGE)
             
             if st.button("🔄 Reset Auction"):
-                db.reset_auction()
-                st.warning("Auction Reset! All players are now Available.")
+                try:
+                    db.reset_auction()
+                    st.warning("Auction Reset! All players are now Available.")
+                except sqlite3.OperationalError:
+                    st.error(BUSY_MESSAGE)
+
+            st.divider()
+
+            st.subheader("🗂️ Archive Season")
+            season_id = st.text_input("Season id", placeholder="e.g. ipl-2024",
+                                      help="Saves a copy of the current auction for the Analytics season picker.")
+            if st.button("Archive Auction", disabled=not season_id):
+                try:
+                    db.archive_auction(season_id)
+                    st.success(f"Archived as {season_id}.")
+                except ValueError as e:
+                    st.error(str(e))
+                except sqlite3.OperationalError:
+                    st.error(BUSY_MESSAGE)
+
+        st.divider()
+        render_bidding()
+
+        st.divider()
+        render_jobs()
+
+        st.divider()
+        st.subheader("⏱️ Performance")
+        replica = db.replica_info()
+        if replica is not None:
+            st.caption(f"Reading from a snapshot taken {replica['age']:.1f} s ago "
+                       f"({replica['refreshes']} refreshes so far).")
+        if not db.profiling_enabled():
+            st.caption("Enable **Record performance** in the sidebar to time database calls.")
+        summary = db.profile_summary()
+        if not summary.empty:
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+            with st.expander("Recent calls"):
+                import pandas as pd
+                recent = pd.DataFrame(db.profile_records()[-50:][::-1])
+                recent['sql'] = recent['sql'].map(lambda sql: "\n".join(sql))
+                st.dataframe(recent[['operation', 'kind', 'ms', 'rows', 'statements', 'sql']],
+                             use_container_width=True, hide_index=True)
+            c1, c2 = st.columns(2)
+            c1.download_button("Download JSON", db.export_profile_json(),
+                               file_name="profile.json", mime="application/json")
+            if c2.button("Clear Measurements"):
+                db.clear_profile()
+                st.rerun()
+
+    poll_jobs()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,120 @@
+"""
+Point-in-time auction history.
+
+database.py appends every change to a player's auction_status/final_price to
+auction_events (simulate_auction, reset_auction, bidding.close_bidding and
+imported outcomes), tagged with the auction round. reset_auction starts the
+next round. Every SNAPSHOT_EVERY events the writer also stores the full outcome
+state in auction_snapshots.
+
+Rebuilding the state as of an event loads the nearest snapshot at or before it
+and replays only the events after that. The cost is bounded by the snapshot
+interval (or by one write that crossed it), not by how long the history is.
+"""
+import database as db
+
+PLAYER_COLUMNS = "id, name, role, nationality, base_price, skill_rating"
+
+
+def _round_end(conn, auction_round):
+    """Id of the last event logged in or before auction_round (0 if none)."""
+    return conn.execute('''
+        SELECT COALESCE(MAX(id), 0) FROM auction_events
+        WHERE round = (SELECT MAX(round) FROM auction_events WHERE round <= ?)
+    ''', (auction_round,)).fetchone()[0]
+
+
+def _outcomes_at(conn, event_id):
+    """(player_id, auction_status, final_price) of every non-Available player just after event_id."""
+    import pandas as pd
+    row = conn.execute("SELECT event_id, data FROM auction_snapshots WHERE event_id <= ? "
+                       "ORDER BY event_id DESC LIMIT 1", (event_id,)).fetchone()
+    since = row[0] if row else 0
+    replay = pd.read_sql_query(
+        "SELECT player_id, auction_status, final_price FROM auction_events WHERE id > ? AND id <= ? ORDER BY id",
+        conn, params=(since, event_id)).drop_duplicates('player_id', keep='last')
+    if row:
+        snapshot = db._decode_state(row[1])
+        replay = pd.concat([snapshot[~snapshot['player_id'].isin(replay['player_id'])], replay])
+    return replay[replay['auction_status'] != 'Available']
+
+
+def _apply_outcomes(players, outcomes):
+    state = players.merge(outcomes.rename(columns={'player_id': 'id'}), on='id', how='left')
+    state['auction_status'] = state['auction_status'].fillna('Available').astype(str)
+    state['final_price'] = state['final_price'].fillna(0).astype('int64')
+    return state
+
+
+def _players(conn):
+    import pandas as pd
+    return pd.read_sql_query(f"SELECT {PLAYER_COLUMNS} FROM players ORDER BY id", conn)
+
+
+@db.profiled
+def state_as_of(event_id=None, auction_round=None):
+    """
+    Every player with the auction_status and final_price they had just after
+    event_id, or at the end of auction_round; the latest state by default.
+    Players imported later are listed as Available.
+    """
+    with db.read_connection() as conn:
+        if auction_round is not None:
+            event_id = _round_end(conn, auction_round)
+        elif event_id is None:
+            event_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM auction_events").fetchone()[0]
+        return db._cached_read(conn, ('state_as_of', event_id),
+                               lambda: _apply_outcomes(_players(conn), _outcomes_at(conn, event_id)))
+
+
+@db.profiled
+def auction_rounds():
+    """One row per round with events: round, events, first_event, last_event, started_at."""
+    import pandas as pd
+
+    def compute():
+        # Counts and id ranges come from the round index alone
+        return pd.read_sql_query('''
+            SELECT r.*, (SELECT created_at FROM auction_events WHERE id = r.first_event) AS started_at
+            FROM (SELECT round, COUNT(*) AS events, MIN(id) AS first_event, MAX(id) AS last_event
+                  FROM auction_events GROUP BY round) AS r
+            ORDER BY round
+        ''', conn)
+
+    with db.read_connection() as conn:
+        return db._cached_read(conn, ('auction_rounds',), compute)
+
+
+def _role_outcomes(state):
+    return state.assign(
+        sold=state['auction_status'] == 'Sold',
+        unsold=state['auction_status'] == 'Unsold',
+    ).groupby('role')[['sold', 'unsold', 'final_price']].sum().rename(columns={'final_price': 'spend'})
+
+
+@db.profiled
+def compare_rounds(round_a, round_b):
+    """
+    How outcomes changed from the end of round_a to the end of round_b.
+    Returns a dict with:
+      roles: sold, unsold and spend per role in each round, plus the changes
+      players: every player whose outcome differs, biggest price swing first
+    """
+    def compute():
+        players = _players(conn)
+        a = _apply_outcomes(players, _outcomes_at(conn, _round_end(conn, round_a)))
+        b = _apply_outcomes(players, _outcomes_at(conn, _round_end(conn, round_b)))
+
+        roles = _role_outcomes(a).join(_role_outcomes(b), lsuffix='_a', rsuffix='_b').astype('int64')
+        roles['sold_change'] = roles['sold_b'] - roles['sold_a']
+        roles['spend_change'] = roles['spend_b'] - roles['spend_a']
+
+        moved = a.merge(b[['id', 'auction_status', 'final_price']], on='id', suffixes=('_a', '_b'))
+        moved = moved[(moved['auction_status_a'] != moved['auction_status_b'])
+                      | (moved['final_price_a'] != moved['final_price_b'])]
+        moved = moved.assign(price_change=moved['final_price_b'] - moved['final_price_a'])
+        moved = moved.iloc[moved['price_change'].abs().argsort(kind='stable')[::-1]]
+        return {'roles': roles.reset_index(), 'players': moved.reset_index(drop=True)}
+
+    with db.read_connection() as conn:
+        return db._cached_read(conn, ('compare_rounds', round_a, round_b), compute)
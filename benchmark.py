@@ -0,0 +1,753 @@
+"""
+Local performance benchmarks for database.py.
+
+Usage:
+    python benchmark.py pool
+    python benchmark.py import
+    python benchmark.py simulate
+    python benchmark.py montecarlo
+    python benchmark.py snapshot
+    python benchmark.py bidding
+    python benchmark.py startup
+    python benchmark.py history
+    python benchmark.py similarity
+    python benchmark.py percentiles
+    python benchmark.py upsert
+    python benchmark.py columnar
+    python benchmark.py shards
+    python benchmark.py replica
+    python benchmark.py pricing
+    python benchmark.py suite [--sizes 10000 100000 1000000] [--compare baseline.json]
+
+The suite times every database.py entry point on seeded synthetic pools,
+writes the medians to JSON, and with --compare exits non-zero when any
+operation is slower than the baseline run by more than --threshold.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import database as db
+import monte_carlo as mc
+import player_store
+from synthetic_players import generate_players
+
+BENCH_DB = "bench_scout.db"
+
+
+def _remove_db(path):
+    db.close_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _setup_db(csv_path="players.csv"):
+    _remove_db(BENCH_DB)
+    db.DB_NAME = BENCH_DB
+    db.init_db()
+    db.bulk_import(pd.read_csv(csv_path))
+
+
+def _unpooled_fetch(filters):
+    """The pre-pool access pattern: open, query, close on every call."""
+    conn = sqlite3.connect(BENCH_DB)
+    try:
+        query = "SELECT * FROM players WHERE role IN (?)"
+        return pd.read_sql_query(query, conn, params=filters['role'])
+    finally:
+        conn.close()
+
+
+def _pooled_fetch(filters):
+    """fetch_players' query on the pooled connection, skipping the result cache
+    so both sides of bench_pool run the same SQL on every call."""
+    with db.read_connection() as conn:
+        query, params = db._players_query(conn, filters)
+        return pd.read_sql_query(query, conn, params=params)
+
+
+def _reads_per_second(read, seconds, threads):
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(slot):
+        n = 0
+        while time.perf_counter() < deadline:
+            read()
+            n += 1
+        counts[slot] = n
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(counts) / seconds
+
+
+def bench_pool(seconds=2.0, threads=(1, 4)):
+    """Reads/sec for fetch_players with pooled connections vs connect-per-call."""
+    _setup_db()
+    filters = {'role': ['Batsman']}
+    results = []
+    for n in threads:
+        unpooled = _reads_per_second(lambda: _unpooled_fetch(filters), seconds, n)
+        pooled = _reads_per_second(lambda: _pooled_fetch(filters), seconds, n)
+        results.append({'threads': n, 'unpooled_rps': round(unpooled), 'pooled_rps': round(pooled),
+                        'speedup': round(pooled / unpooled, 2)})
+        print(f"threads={n}: unpooled {unpooled:,.0f} reads/s | pooled {pooled:,.0f} reads/s "
+              f"({pooled / unpooled:.2f}x)")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def _import_worker(path, queue):
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    rows = db.bulk_import(path)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    db.close_connections()
+    queue.put((rows, elapsed, (rss_after - rss_before) / 1024))
+
+
+def bench_import(sizes=(10_000, 100_000, 1_000_000)):
+    """Rows/sec and peak memory growth of the streaming CSV import, per file size."""
+    csv_path = "bench_players.csv"
+    results = []
+    ctx = multiprocessing.get_context("fork")
+    for n in sizes:
+        generate_players(n).to_csv(csv_path, index=False)
+        size_mb = os.path.getsize(csv_path) / 2**20
+        _remove_db(BENCH_DB)
+        db.DB_NAME = BENCH_DB
+        db.init_db()
+        db.close_connections()
+        # Fresh process per run so ru_maxrss reflects only this import
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_import_worker, args=(csv_path, queue))
+        proc.start()
+        rows, elapsed, peak_mb = queue.get()
+        proc.join()
+        results.append({'rows': rows, 'file_mb': round(size_mb, 1), 'rows_per_sec': round(rows / elapsed),
+                        'peak_rss_growth_mb': round(peak_mb, 1)})
+        print(f"{rows:>9,} rows ({size_mb:6.1f} MB): {rows / elapsed:>10,.0f} rows/s, "
+              f"peak RSS +{peak_mb:.1f} MB")
+    os.remove(csv_path)
+    _remove_db(BENCH_DB)
+    return results
+
+
+def bench_columnar(players=1_000_000):
+    """bulk_import from CSV vs Parquet vs Arrow IPC: parse time alone, full import and peak memory."""
+    import pyarrow as pa
+    import pyarrow.feather
+    frame = generate_players(players)
+    paths = {'csv': "bench_players.csv", 'parquet': "bench_players.parquet", 'arrow': "bench_players.arrow"}
+    frame.to_csv(paths['csv'], index=False)
+    frame.to_parquet(paths['parquet'], index=False)
+    pa.feather.write_feather(pa.Table.from_pandas(frame, preserve_index=False), paths['arrow'],
+                             chunksize=db.IMPORT_CHUNK_SIZE)
+    del frame
+    results = []
+    ctx = multiprocessing.get_context("fork")
+    for fmt, path in paths.items():
+        parse_ms = _timed_ms(lambda: [db._prepare_import_chunk(c) for c in db._iter_chunks(path, db.IMPORT_CHUNK_SIZE)])
+        _remove_db(BENCH_DB)
+        db.DB_NAME = BENCH_DB
+        db.init_db()
+        db.close_connections()
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_import_worker, args=(path, queue))
+        proc.start()
+        rows, elapsed, peak_mb = queue.get()
+        proc.join()
+        size_mb = os.path.getsize(path) / 2**20
+        results.append({'format': fmt, 'rows': rows, 'file_mb': round(size_mb, 1), 'parse_ms': round(parse_ms),
+                        'import_ms': round(elapsed * 1000), 'peak_rss_growth_mb': round(peak_mb, 1)})
+        print(f"{fmt:>8} ({size_mb:6.1f} MB): read+validate {parse_ms:7.0f} ms | import {elapsed * 1000:7.0f} ms | "
+              f"peak RSS +{peak_mb:.1f} MB")
+        os.remove(path)
+    _remove_db(BENCH_DB)
+    return results
+
+
+def _legacy_simulate():
+    """The previous per-player loop with one UPDATE (and one event) per row, for comparison."""
+    with db.transaction() as conn:
+        players = conn.execute("SELECT id, base_price, skill_rating FROM players WHERE auction_status = 'Available'").fetchall()
+        updates = []
+        for pid, base, rating in players:
+            if random.random() > (0.3 if rating > 7 else 0.6):
+                final_price = 5 * round(int(base * (1 + (rating / 10) * random.uniform(1, 4))) / 5)
+                updates.append(('Sold', final_price, pid))
+            else:
+                updates.append(('Unsold', 0, pid))
+        conn.executemany("UPDATE players SET auction_status = ?, final_price = ? WHERE id = ?", updates)
+        event = (db._current_round(conn), 'simulate', time.time())
+        conn.executemany("INSERT INTO auction_events (round, kind, created_at, player_id, auction_status, final_price) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", [(*event, pid, status, price) for status, price, pid in updates])
+        db._maybe_snapshot(conn)
+    return len(updates)
+
+
+def _load_synthetic(n):
+    _remove_db(BENCH_DB)
+    db.DB_NAME = BENCH_DB
+    db.init_db()
+    db.bulk_import(generate_players(n))
+
+
+def bench_simulate(sizes=(100_000, 1_000_000)):
+    """simulate_auction vs the legacy per-row loop on n Available players."""
+    results = []
+    for n in sizes:
+        _load_synthetic(n)
+        timings = {}
+        for label, run in (('legacy', _legacy_simulate), ('vectorized', lambda: db.simulate_auction(seed=0))):
+            db.reset_auction()
+            # Neither side should pay to checkpoint the other's (or the reset's) writes
+            with db.get_connection() as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            start = time.perf_counter()
+            run()
+            timings[label] = time.perf_counter() - start
+        results.append({'players': n, 'legacy_s': round(timings['legacy'], 3),
+                        'vectorized_s': round(timings['vectorized'], 3)})
+        print(f"{n:>9,} players: legacy {timings['legacy']:.2f}s | vectorized {timings['vectorized']:.2f}s "
+              f"({timings['legacy'] / timings['vectorized']:.1f}x)")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def bench_monte_carlo(players=10_000, iterations=10_000):
+    """Wall time of a read-only Monte Carlo forecast, single process vs all cores."""
+    _load_synthetic(players)
+    results = []
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        mc.run_monte_carlo(iterations=iterations, seed=0, workers=workers)
+        elapsed = time.perf_counter() - start
+        results.append({'players': players, 'iterations': iterations, 'workers': workers,
+                        'seconds': round(elapsed, 2)})
+        print(f"{iterations:,} auctions x {players:,} players, {workers} worker(s): {elapsed:.2f}s")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def _bid_load(place, clients, bids_per_client, player_ids, base_prices, seed):
+    """clients threads each placing bids_per_client bids; returns per-bid latencies (ms) and wall time."""
+    latencies = [[] for _ in range(clients)]
+    start_line = threading.Barrier(clients + 1)
+
+    def client(i):
+        rng = random.Random(seed + i)
+        start_line.wait()
+        for n in range(bids_per_client):
+            k = rng.randrange(len(player_ids))
+            # Rising amounts with jitter: most bids win, some lose to a concurrent higher one
+            amount = int(base_prices[k]) + n + rng.randrange(5)
+            t = time.perf_counter()
+            place(int(player_ids[k]), f"Team {i}", amount)
+            latencies[i].append((time.perf_counter() - t) * 1000)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    start_line.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return [ms for per_client in latencies for ms in per_client], time.perf_counter() - start
+
+
+def bench_bidding(players=10_000, clients=16, bids_per_client=1000):
+    """Bid throughput and p50/p99 latency from concurrent clients: group commit vs a commit per bid."""
+    import bidding
+    results = []
+    modes = {
+        'group commit': bidding.place_bid,
+        'commit per bid': lambda pid, team, amount: bidding.place_bids([(pid, team, amount, time.time())])[0],
+    }
+    for mode, place in modes.items():
+        _load_synthetic(players)
+        pool = db.fetch_players()
+        latencies, elapsed = _bid_load(place, clients, bids_per_client, pool['id'].to_numpy(),
+                                       pool['base_price'].to_numpy(), seed=0)
+        with db.get_connection() as conn:
+            accepted = conn.execute("SELECT COUNT(*) FROM bids").fetchone()[0]
+            # Lost update check: every leading bid must be the highest bid logged for that player
+            lost = conn.execute('''
+                SELECT COUNT(*) FROM players p
+                WHERE current_bid != COALESCE((SELECT MAX(amount) FROM bids b WHERE b.player_id = p.id), 0)
+            ''').fetchone()[0]
+        assert lost == 0, f"{lost} players lost their highest bid"
+        latencies.sort()
+        row = {'mode': mode, 'clients': clients, 'bids': len(latencies), 'accepted': accepted,
+               'bids_per_sec': round(len(latencies) / elapsed),
+               'p50_ms': round(latencies[len(latencies) // 2], 2),
+               'p99_ms': round(latencies[int(len(latencies) * 0.99)], 2)}
+        results.append(row)
+        print(f"{mode:>14}: {row['bids_per_sec']:>7,} bids/s | p50 {row['p50_ms']:.2f} ms | "
+              f"p99 {row['p99_ms']:.2f} ms | {accepted:,} of {row['bids']:,} accepted, no lost updates")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def bench_pricing(players=1_000_000, debuts=10_000):
+    """Price model: first fit, catching up with a round of new sales vs refitting, and scoring the pool."""
+    import pricing
+    _load_synthetic(players)
+    db.simulate_auction(seed=1)
+    fit_ms = _timed_ms(pricing.get_model)
+    db.bulk_import(generate_players(debuts, seed=2).assign(name=lambda d: "Debut " + d['name']))
+    db.simulate_auction(seed=3)
+    new_sales = db.count_players({'search': 'Debut', 'auction_status': ['Sold']})
+    catch_up_ms = _timed_ms(pricing.get_model)
+    pricing._models.clear()
+    refit_ms = _timed_ms(pricing.get_model)
+    db.reset_auction()
+    score_ms = _timed_ms(pricing.score_available)
+    model = pricing.get_model()
+    pool = db.fetch_players()
+    predict_ms = _median_ms(lambda: model.predict(pool))
+    results = {'players': players, 'sales': model.sales, 'new_sales': new_sales, 'fit_ms': round(fit_ms, 1),
+               'catch_up_ms': round(catch_up_ms, 1), 'refit_ms': round(refit_ms, 1),
+               'score_available_ms': round(score_ms, 1), 'predict_ms': round(predict_ms, 1),
+               'r_squared': round(model.r_squared(), 3)}
+    print(f"{players:,} players, {model.sales:,} sales: fit {fit_ms:.0f} ms | +{new_sales:,} sales caught up in "
+          f"{catch_up_ms:.0f} ms vs refit {refit_ms:.0f} ms | score {players + debuts:,} available {score_ms:.0f} ms "
+          f"(matrix multiply {predict_ms:.0f} ms) | R² {results['r_squared']}")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def _dashboard_reads(stop, clients, seed):
+    """Read latencies (ms) and error count from clients running filtered counts and pages until stop."""
+    latencies, errors = [], []
+
+    def client(slot):
+        rng = random.Random(seed + slot)
+        while not stop.is_set():
+            # A fresh price floor each time, so the result cache can't answer
+            filters = {'price_min': rng.randint(20, 180), 'role': [rng.choice(['Batsman', 'Bowler'])]}
+            start = time.perf_counter()
+            try:
+                db.count_players(filters)
+                db.fetch_players_page(filters, sort_by='skill_rating', descending=True)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for w in workers:
+        w.start()
+    return workers, latencies, errors
+
+
+def bench_replica(players=1_000_000, clients=4, idle_seconds=2.0):
+    """Dashboard read p50/p99 while idle and while simulate_auction rewrites every player: file vs read replica."""
+    _load_synthetic(players)
+    results = []
+    try:
+        for mode in ('file', 'replica'):
+            db.enable_replica(mode == 'replica')
+            db.count_players()  # the first read takes the initial snapshot
+            for phase in ('idle', 'simulate'):
+                stop = threading.Event()
+                workers, latencies, errors = _dashboard_reads(stop, clients, seed=len(results))
+                start = time.perf_counter()
+                if phase == 'simulate':
+                    db.simulate_auction(seed=1)
+                else:
+                    time.sleep(idle_seconds)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                stop.set()
+                for w in workers:
+                    w.join()
+                if phase == 'simulate':
+                    db.reset_auction()
+                latencies.sort()
+                row = {'mode': mode, 'phase': phase, 'elapsed_ms': round(elapsed_ms), 'reads': len(latencies),
+                       'errors': len(errors), 'p50_ms': round(latencies[len(latencies) // 2], 1),
+                       'p99_ms': round(latencies[int(len(latencies) * 0.99)], 1),
+                       'max_ms': round(latencies[-1], 1)}
+                results.append(row)
+                print(f"{mode:>7} {phase:>8} ({elapsed_ms:6.0f} ms): {row['reads']:>5} reads | "
+                      f"p50 {row['p50_ms']:7.1f} ms | p99 {row['p99_ms']:7.1f} ms | max {row['max_ms']:7.1f} ms | "
+                      f"{row['errors']} errors")
+    finally:
+        db.enable_replica(False)
+        _remove_db(BENCH_DB)
+    return results
+
+
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import database as db
+import_ms = (time.perf_counter() - start) * 1000
+pandas_at_import = 'pandas' in sys.modules
+from streamlit.testing.v1 import AppTest
+db.enable_profiling()
+app = AppTest.from_file({app!r}, default_timeout=600)
+start = time.perf_counter()
+app.run()
+render_ms = (time.perf_counter() - start) * 1000
+ms = {{}}
+for record in db.profile_records():
+    ms[record['operation']] = ms.get(record['operation'], 0) + record['ms']
+print(json.dumps({{'import_ms': import_ms, 'pandas_at_import': pandas_at_import, 'render_ms': render_ms,
+                  'startup_ms': ms.get('init_db', 0) + ms.get('warm_start', 0),
+                  'discovery_ms': ms.get('tab:discovery', 0), 'errors': len(app.exception)}}))
+"""
+
+
+def bench_startup(sizes=(10, 100_000)):
+    """Cold start in a fresh process: CSV warm start vs the prebuilt snapshot, per registry size."""
+    import subprocess
+    import tempfile
+    from build_snapshot import build_snapshot
+    root = os.path.dirname(os.path.abspath(__file__))
+    probe = _STARTUP_PROBE.format(root=root, app=os.path.join(root, "app.py"))
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            csv_path = os.path.join(workdir, "players.csv")
+            if n == 10:
+                csv_path = os.path.join(root, "players.csv")
+            else:
+                generate_players(n).to_csv(csv_path, index=False)
+            for mode in ("csv warm start", "prebuilt snapshot"):
+                run_dir = os.path.join(workdir, mode.split()[0])
+                os.mkdir(run_dir)
+                if mode == "prebuilt snapshot":
+                    build_snapshot(csv_path, os.path.join(run_dir, db.DB_NAME))
+                else:
+                    os.symlink(csv_path, os.path.join(run_dir, "players.csv"))
+                out = subprocess.run([sys.executable, "-c", probe], cwd=run_dir, capture_output=True,
+                                     text=True, check=True).stdout
+                row = {'players': n, 'mode': mode, **json.loads(out.strip().splitlines()[-1])}
+                results.append(row)
+                print(f"{n:>8,} players, {mode:<17}: import database {row['import_ms']:6.1f} ms "
+                      f"(pandas loaded: {row['pandas_at_import']}) | init+warm start {row['startup_ms']:8.1f} ms | "
+                      f"discovery tab {row['discovery_ms']:7.1f} ms | first render {row['render_ms']:8.1f} ms")
+    return results
+
+
+# Representative Player Discovery filter mixes, named for the JSON results
+FILTER_MIXES = {
+    'default_range': {'price_min': 20, 'price_max': 200},
+    'role_price': {'role': ['Bowler'], 'price_min': 50, 'price_max': 150},
+    'nation_rating': {'nationality': ['India', 'Australia'], 'rating_min': 7},
+    'search_role': {'search': 'Player 00012', 'role': ['Batsman', 'Bowler']},
+    'short_search': {'search': '99', 'price_min': 20, 'price_max': 200},
+}
+
+
+def _median_ms(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def bench_snapshot(players=200_000):
+    """Memory per player and filter latency: columnar snapshot vs fetch_players."""
+    _load_synthetic(players)
+    frame = db.fetch_players()
+    snapshot = player_store.get_snapshot()
+    frame_bytes = frame.memory_usage(deep=True, index=False).sum() / len(frame)
+    snap_bytes = snapshot.memory_usage() / len(snapshot)
+    print(f"memory per player: DataFrame {frame_bytes:.0f} B | snapshot {snap_bytes:.0f} B")
+    results = {'players': players, 'frame_bytes_per_player': round(frame_bytes),
+               'snapshot_bytes_per_player': round(snap_bytes), 'filters': []}
+    for filters in FILTER_MIXES.values():
+        def sql():
+            db.clear_cache()  # measure the query, not the result cache
+            db.fetch_players(filters)
+        sql_ms = _median_ms(sql)
+        mask_ms = _median_ms(lambda: snapshot.mask(filters))
+        results['filters'].append({'filters': filters, 'sql_ms': round(sql_ms, 2), 'mask_ms': round(mask_ms, 2)})
+        print(f"{filters}: fetch_players {sql_ms:.1f} ms | snapshot mask {mask_ms:.2f} ms")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def bench_history(players=200_000, rounds=6):
+    """Point-in-time auction state: snapshot + replay vs replaying the whole event log."""
+    import auction_history
+    results = {'players': players, 'rounds': rounds}
+    for label, interval in (('snapshots', db.SNAPSHOT_EVERY), ('full_replay', 10 ** 12)):
+        previous, db.SNAPSHOT_EVERY = db.SNAPSHOT_EVERY, interval
+        try:
+            _load_synthetic(players)
+            simulate_ms = []
+            for r in range(rounds):
+                if r:
+                    db.reset_auction()
+                simulate_ms.append(_timed_ms(lambda: db.simulate_auction(seed=r)))
+            state_ms = _median_ms(_cold(lambda: auction_history.state_as_of(auction_round=rounds - 1)), repeats=3)
+        finally:
+            db.SNAPSHOT_EVERY = previous
+        results[label] = {'simulate_ms': round(sorted(simulate_ms)[len(simulate_ms) // 2], 1),
+                          'state_as_of_ms': round(state_ms, 1)}
+        print(f"{label}: simulate_auction {results[label]['simulate_ms']:.0f} ms | "
+              f"state as of round {rounds - 1} {state_ms:.0f} ms")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def bench_similarity(players=100_000, queries=500):
+    """similar_players latency: index search alone and end to end, plus incremental catch-up."""
+    import similarity
+    _load_synthetic(players)
+    build_ms = _timed_ms(similarity.get_index)
+    index = similarity.get_index()
+    ids = np.random.default_rng(0).integers(1, players + 1, queries)
+
+    def percentiles(fn):
+        times = sorted(_timed_ms(lambda: fn(int(pid))) for pid in ids)
+        return round(times[len(times) // 2], 3), round(times[int(len(times) * 0.99)], 3)
+
+    results = {'players': players, 'build_ms': round(build_ms, 1),
+               'index_ms': percentiles(lambda pid: index.neighbours(pid, 10)),
+               'similar_players_ms': percentiles(lambda pid: similarity.similar_players(pid, 10))}
+    db.bulk_import(generate_players(1000, seed=1).assign(name=lambda d: "New " + d['name']))
+    results['catch_up_1000_ms'] = round(_timed_ms(similarity.get_index), 1)
+    print(f"{players:,} players: build {build_ms:.0f} ms | index p50/p99 {results['index_ms']} ms | "
+          f"similar_players p50/p99 {results['similar_players_ms']} ms | "
+          f"+1,000 players caught up in {results['catch_up_1000_ms']} ms")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def bench_percentiles(players=200_000, inserts=20):
+    """Role percentiles: full recompute, ranking one new player, and sorting/filtering on the scores."""
+    _load_synthetic(players)
+    refresh_ms = _timed_ms(db.refresh_percentiles)
+    newcomer = generate_players(1, seed=7).iloc[0].to_dict()
+    add_ms = sorted(_timed_ms(lambda: db.add_player({**newcomer, 'name': f"Newcomer {i}"})) for i in range(inserts))
+    top_ms = _median_ms(_cold(lambda: db.fetch_players_page(sort_by='value_score', descending=True)))
+    filtered_ms = _median_ms(_cold(lambda: db.count_players({'role': ['Bowler'], 'skill_rating_pct_min': 0.9})))
+    results = {'players': players, 'refresh_ms': round(refresh_ms, 1),
+               'add_player_ms': round(add_ms[len(add_ms) // 2], 1),
+               'top_value_page_ms': round(top_ms, 2), 'count_top_decile_ms': round(filtered_ms, 2)}
+    print(f"{players:,} players: refresh {refresh_ms:.0f} ms | add_player {results['add_player_ms']} ms | "
+          f"top value page {top_ms:.1f} ms | count top-decile bowlers {filtered_ms:.1f} ms")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def bench_upsert(players=100_000, changed=0.02, new=0.01):
+    """A daily feed refresh: upsert_players merge vs wiping the table and re-importing."""
+    feed = generate_players(players)
+    rng = np.random.default_rng(1)
+    touched = rng.choice(players, int(players * changed), replace=False)
+    feed.loc[touched, 'matches_played'] += 1
+    extra = generate_players(int(players * new), seed=2).assign(name=lambda d: "Debut " + d['name'])
+    tomorrow = pd.concat([feed, extra], ignore_index=True)
+
+    _load_synthetic(players)
+    start = time.perf_counter()
+    counts = db.upsert_players(tomorrow)
+    merge_ms = (time.perf_counter() - start) * 1000
+
+    def reload():
+        with db.transaction() as conn:
+            conn.execute("DELETE FROM players")
+            db.bulk_import(tomorrow)
+    _load_synthetic(players)
+    reload_ms = _timed_ms(reload)
+    results = {'players': players, **counts, 'merge_ms': round(merge_ms, 1), 'reload_ms': round(reload_ms, 1)}
+    print(f"{players:,} players, feed of {len(tomorrow):,}: {counts} | upsert {merge_ms:.0f} ms | "
+          f"wipe and reload {reload_ms:.0f} ms")
+    _remove_db(BENCH_DB)
+    return results
+
+
+def bench_shards(players=100_000, shards=4):
+    """cross_auction.role_prices over archived shards: in-process vs one worker process per shard."""
+    import shutil
+    import cross_auction
+    previous_dir, db.AUCTIONS_DIR = db.AUCTIONS_DIR, "bench_auctions"
+    shutil.rmtree(db.AUCTIONS_DIR, ignore_errors=True)
+    try:
+        for season in range(shards):
+            _load_synthetic(players)
+            db.simulate_auction(seed=100 + season)
+            db.archive_auction(f"season-{season}")
+        seasons = db.list_auctions()
+        serial_ms = _median_ms(lambda: cross_auction.role_prices(seasons, workers=1))
+        parallel_ms = _median_ms(lambda: cross_auction.role_prices(seasons, workers=shards))
+        trajectory_ms = _median_ms(lambda: cross_auction.price_trajectories(["Player 0000012"], seasons))
+    finally:
+        shutil.rmtree(db.AUCTIONS_DIR, ignore_errors=True)
+        db.AUCTIONS_DIR = previous_dir
+        _remove_db(BENCH_DB)
+    results = {'players': players, 'shards': shards, 'cpus': os.cpu_count(), 'serial_ms': round(serial_ms, 1),
+               'parallel_ms': round(parallel_ms, 1), 'trajectory_ms': round(trajectory_ms, 1)}
+    print(f"{shards} shards x {players:,} players ({os.cpu_count()} CPUs): role_prices in-process {serial_ms:.0f} ms | "
+          f"{shards} workers {parallel_ms:.0f} ms | price_trajectories {trajectory_ms:.0f} ms")
+    return results
+
+
+def _timed_ms(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _cold(fn):
+    """Runs fn with an empty result cache, so the query itself is timed."""
+    def run():
+        db.clear_cache()
+        fn()
+    return run
+
+
+def _startup():
+    """What a new app session does: open a connection, check the schema, maybe warm-start."""
+    db.close_connections()
+    db.init_db()
+    db.warm_start()
+
+
+def run_suite(sizes=(10_000, 100_000, 1_000_000), seed=0, repeats=5):
+    """
+    Times every database.py entry point on seeded synthetic pools of each size.
+    Returns {'meta': ..., 'results': {size: {operation: median ms}}}.
+    """
+    results = {}
+    for n in sizes:
+        print(f"--- {n:,} players ---")
+        _remove_db(BENCH_DB)
+        db.DB_NAME = BENCH_DB
+        db.init_db()
+        players = generate_players(n, seed)
+        timings = {'bulk_import': _timed_ms(lambda: db.bulk_import(players))}
+        del players
+
+        for name, filters in FILTER_MIXES.items():
+            timings[f'fetch_players[{name}]'] = _median_ms(_cold(lambda: db.fetch_players(filters)), repeats)
+            timings[f'fetch_players_page[{name}]'] = _median_ms(
+                _cold(lambda: db.fetch_players_page(filters, 'skill_rating', True)), repeats)
+            timings[f'count_players[{name}]'] = _median_ms(_cold(lambda: db.count_players(filters)), repeats)
+        timings['fetch_players_cached'] = _median_ms(lambda: db.fetch_players(FILTER_MIXES['role_price']), repeats)
+        timings['startup'] = _median_ms(_startup, repeats)
+        timings['get_stats'] = _median_ms(_cold(db.get_stats), repeats)
+        timings['price_rating_bins'] = _median_ms(_cold(db.price_rating_bins), repeats)
+        timings['sample_players'] = _median_ms(_cold(db.sample_players), repeats)
+
+        # Writes change state, so pair each simulation with a reset
+        simulate, reset = [], []
+        for i in range(max(1, repeats // 2)):
+            simulate.append(_timed_ms(lambda: db.simulate_auction(seed=i)))
+            reset.append(_timed_ms(db.reset_auction))
+        timings['simulate_auction'] = sorted(simulate)[len(simulate) // 2]
+        timings['reset_auction'] = sorted(reset)[len(reset) // 2]
+
+        for op, ms in timings.items():
+            print(f"  {op:<40} {ms:>10.2f} ms")
+        results[str(n)] = {op: round(ms, 3) for op, ms in timings.items()}
+    _remove_db(BENCH_DB)
+    return {'meta': _suite_meta(seed), 'results': results}
+
+
+def _suite_meta(seed):
+    import platform
+    import subprocess
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"), 'seed': seed,
+            'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+            'pandas': pd.__version__, 'numpy': np.__version__, 'cpus': os.cpu_count()}
+
+
+def compare_results(baseline, current, threshold=0.25, min_ms=5.0):
+    """
+    Lists operations that got slower than baseline by more than threshold
+    (0.25 = 25%). Timings under min_ms in both runs are too noisy to judge.
+    """
+    regressions = []
+    for size, ops in current['results'].items():
+        for op, ms in ops.items():
+            before = baseline['results'].get(size, {}).get(op)
+            if before is None or max(before, ms) < min_ms:
+                continue
+            if ms > before * (1 + threshold):
+                regressions.append({'size': size, 'operation': op, 'baseline_ms': before,
+                                    'current_ms': ms, 'change': round(ms / before - 1, 3)})
+    return regressions
+
+
+def bench_suite(args):
+    report = run_suite(args.sizes, seed=args.seed, repeats=args.repeats)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.threshold, args.min_ms)
+        for r in regressions:
+            print(f"❌ {r['operation']} @ {int(r['size']):,}: {r['baseline_ms']:.2f} -> "
+                  f"{r['current_ms']:.2f} ms (+{r['change']:.0%})")
+        if regressions:
+            raise SystemExit(1)
+        print(f"✅ No regressions over {args.threshold:.0%} against {args.compare}")
+    return report
+
+
+BENCHMARKS = {
+    'pool': bench_pool,
+    'import': bench_import,
+    'simulate': bench_simulate,
+    'montecarlo': bench_monte_carlo,
+    'snapshot': bench_snapshot,
+    'bidding': bench_bidding,
+    'startup': bench_startup,
+    'history': bench_history,
+    'similarity': bench_similarity,
+    'percentiles': bench_percentiles,
+    'upsert': bench_upsert,
+    'columnar': bench_columnar,
+    'shards': bench_shards,
+    'replica': bench_replica,
+    'pricing': bench_pricing,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="benchmark", required=True)
+    for name, fn in BENCHMARKS.items():
+        commands.add_parser(name, help=fn.__doc__)
+    suite = commands.add_parser("suite", help=run_suite.__doc__.strip().splitlines()[0])
+    suite.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--repeats", type=int, default=5)
+    suite.add_argument("--output", default="bench_results.json")
+    suite.add_argument("--compare", metavar="BASELINE_JSON", help="fail if slower than this earlier run")
+    suite.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    suite.add_argument("--min-ms", type=float, default=5.0, help="ignore operations faster than this")
+    args = parser.parse_args()
+    if args.benchmark == "suite":
+        bench_suite(args)
+    else:
+        BENCHMARKS[args.benchmark]()
@@ -0,0 +1,174 @@
+"""
+Live bidding.
+
+place_bid() validates and records a bid atomically. A single conditional UPDATE
+accepts the bid only if the player is still Available and the amount is at
+least the base price and above the current bid. The bid is appended to the bids
+log in the same transaction. Concurrent bids for one player therefore cannot
+overwrite each other: whichever is applied second must beat the first or is
+rejected.
+
+Bids from every thread in the process are handed to one writer thread, which
+commits everything queued so far in a single transaction (group commit).
+Under Pyodide (stlite) there are no threads, so each bid commits on its own.
+
+close_bidding() brings the hammer down. The player is Sold to the leading team
+for the current bid, or Unsold if nobody bid.
+"""
+import queue
+import sys
+import threading
+import time
+
+import pandas as pd
+import database as db
+
+MAX_BATCH = 1000     # bids committed together at most
+BID_TIMEOUT = 10.0   # seconds place_bid waits for its batch to commit
+
+
+def _rejection(conn, player_id, amount):
+    row = conn.execute("SELECT auction_status, base_price, current_bid FROM players WHERE id = ?",
+                       (player_id,)).fetchone()
+    if row is None:
+        return f"No player with id {player_id}"
+    status, base_price, current_bid = row
+    if status != 'Available':
+        return f"Player is already {status}"
+    if amount < base_price:
+        return f"Bid must be at least the base price of ₹{base_price} L"
+    return f"Bid must beat the current bid of ₹{current_bid} L"
+
+
+@db.profiled
+def place_bids(bids):
+    """
+    Applies (player_id, team, amount, placed_at) bids in order, in one
+    transaction. Returns a result dict per bid: accepted, bid_id, reason.
+    """
+    results = []
+    with db.transaction() as conn:
+        for player_id, team, amount, placed_at in bids:
+            accepted = conn.execute('''
+                UPDATE players SET current_bid = ?, current_team = ?
+                WHERE id = ? AND auction_status = 'Available' AND ? >= base_price AND ? > current_bid
+            ''', (amount, team, player_id, amount, amount)).rowcount
+            if accepted:
+                bid_id = conn.execute(
+                    "INSERT INTO bids (player_id, team, amount, placed_at) VALUES (?, ?, ?, ?)",
+                    (player_id, team, amount, placed_at)).lastrowid
+                results.append({'accepted': True, 'bid_id': bid_id, 'reason': None})
+            else:
+                results.append({'accepted': False, 'bid_id': None,
+                                'reason': _rejection(conn, player_id, amount)})
+        if any(result['accepted'] for result in results):
+            db._bump_generation(conn)
+    return results
+
+
+class _Pending:
+    __slots__ = ('bid', 'database', 'result', 'done')
+
+    def __init__(self, bid, database):
+        self.bid = bid
+        self.database = database  # the bidder's database_name(): the writer thread has its own
+        self.result = None
+        self.done = threading.Event()
+
+
+_queue = queue.SimpleQueue()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _write_loop():
+    while True:
+        batch = [_queue.get()]
+        while len(batch) < MAX_BATCH:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        by_database = {}
+        for pending in batch:
+            by_database.setdefault(pending.database, []).append(pending)
+        for name, group in by_database.items():
+            try:
+                with db.use_database(name):
+                    results = place_bids([pending.bid for pending in group])
+            except Exception as e:
+                # e.g. the database stayed locked by another process: every bid in the group fails
+                results = [e] * len(group)
+            for pending, result in zip(group, results):
+                pending.result = result
+                pending.done.set()
+
+
+def _ensure_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, name="bid-writer", daemon=True)
+            _writer.start()
+
+
+def place_bid(player_id, team, amount):
+    """
+    Bids amount (lakhs) on a player for team and waits for it to commit.
+    Returns {'accepted': bool, 'bid_id': int or None, 'reason': str or None}.
+    """
+    team = str(team).strip()
+    if not team:
+        raise ValueError("Team is required")
+    if int(amount) != amount or amount <= 0:
+        raise ValueError(f"Bid must be a positive whole number of lakhs, got {amount!r}")
+    bid = (int(player_id), team, int(amount), time.time())
+
+    if sys.platform == "emscripten":
+        return place_bids([bid])[0]
+    _ensure_writer()
+    pending = _Pending(bid, db.database_name())
+    _queue.put(pending)
+    if not pending.done.wait(BID_TIMEOUT):
+        raise TimeoutError(f"Bid on player {player_id} was not committed within {BID_TIMEOUT}s")
+    if isinstance(pending.result, Exception):
+        raise pending.result
+    return pending.result
+
+
+@db.profiled
+def close_bidding(player_id):
+    """
+    Ends bidding on a player: Sold to the leading team for the current bid, or
+    Unsold without bids. Returns (auction_status, final_price).
+    """
+    with db.transaction() as conn:
+        row = conn.execute("SELECT role, auction_status, current_bid FROM players WHERE id = ?",
+                           (player_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"No player with id {player_id}")
+        role, status, current_bid = row
+        if status != 'Available':
+            raise ValueError(f"Player {player_id} is already {status}")
+        if current_bid > 0:
+            status, price = 'Sold', current_bid
+            conn.execute("UPDATE player_stats SET sold_count = sold_count + 1, "
+                         "total_spend = total_spend + ? WHERE role = ?", (price, role))
+        else:
+            status, price = 'Unsold', 0
+            conn.execute("UPDATE player_stats SET unsold_count = unsold_count + 1 WHERE role = ?", (role,))
+        conn.execute("UPDATE players SET auction_status = ?, final_price = ? WHERE id = ?",
+                     (status, price, player_id))
+        db._log_events(conn, 'hammer', "SELECT id, auction_status, final_price FROM players WHERE id = ?",
+                       (player_id,))
+        db._maybe_snapshot(conn)
+        db._bump_generation(conn)
+    return status, price
+
+
+def bid_history(player_id, limit=20):
+    """Most recent bids on a player, newest first."""
+    with db.get_connection() as conn:
+        return pd.read_sql_query(
+            "SELECT id, team, amount, placed_at FROM bids WHERE player_id = ? ORDER BY id DESC LIMIT ?",
+            conn, params=(player_id, limit))
@@ -0,0 +1,63 @@
+"""
+Builds the prebuilt scout.db that the stlite app ships with.
+
+Usage:
+    python build_snapshot.py [--csv players.csv] [--output scout.db] [--force]
+
+The CSV is loaded through database.bulk_import into a fresh file at the current
+schema version. The script then refreshes planner statistics, merges the name
+search index, and VACUUMs everything into one compact file in rollback-journal
+mode, so there is no -wal file to ship. The app opens the result as-is:
+init_db() finds the schema current and warm_start() finds players already
+present, so a cold start does no import work.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import database as db
+
+
+def build_snapshot(csv_path="players.csv", output=db.DB_NAME):
+    """Writes a compacted, fully migrated database for csv_path to output. Returns the row count."""
+    tmp = output + ".building"
+    previous_db = db.DB_NAME
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(tmp + suffix):
+            os.remove(tmp + suffix)
+    try:
+        db.DB_NAME = tmp
+        db.init_db()
+        rows = db.bulk_import(csv_path)
+        with db.get_connection() as conn:
+            if db._has_table(conn, 'players_fts'):
+                conn.execute("INSERT INTO players_fts (players_fts) VALUES ('optimize')")
+            conn.execute("ANALYZE")
+    finally:
+        db.close_connections()
+        db.DB_NAME = previous_db
+
+    conn = sqlite3.connect(tmp, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp, output)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="players.csv")
+    parser.add_argument("--output", default=db.DB_NAME)
+    parser.add_argument("--force", action="store_true", help="replace an existing output database")
+    args = parser.parse_args()
+    if os.path.exists(args.output) and not args.force:
+        sys.exit(f"{args.output} already exists; pass --force to replace it")
+    start = time.perf_counter()
+    rows = build_snapshot(args.csv, args.output)
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"Built {args.output}: {rows:,} players, {size_kb:,.0f} KB in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,113 @@
+"""
+Analytics across auction shards (see database.use_auction).
+
+Each shard is read in its own worker process, which returns partial
+aggregates: per-role sums, counts and maxima, never averages. The parent
+merges them, so the result is exact however the shards are split across
+workers. Workers open their shard read-only and never touch the parent's
+pooled connections. Under Pyodide (stlite), or with a single shard, the shards
+are read one after another in-process.
+"""
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import database as db
+
+STAT_COLUMNS = ['players', 'total_base_price', 'max_rating', 'sold', 'unsold', 'total_spend']
+TRAJECTORY_COLUMNS = ['name', 'nationality', 'role', 'base_price', 'skill_rating', 'auction_status', 'final_price']
+
+
+def _default_workers(shards):
+    if sys.platform == "emscripten":
+        return 1  # Pyodide (stlite) has no subprocesses
+    return max(1, min(shards, os.cpu_count() or 1))
+
+
+def _read_only(path):
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def _role_partials(path):
+    """One shard's per-role partial aggregates, from its maintained player_stats table."""
+    conn = _read_only(path)
+    try:
+        return conn.execute('''
+            SELECT role, player_count, total_base_price, max_rating, sold_count, unsold_count, total_spend
+            FROM player_stats WHERE player_count > 0
+        ''').fetchall()
+    finally:
+        conn.close()
+
+
+def _trajectory_rows(path, names):
+    """The named players' rows in one shard, found through the (name, nationality) key."""
+    conn = _read_only(path)
+    try:
+        placeholders = ','.join('?' for _ in names)
+        return conn.execute(f"SELECT {', '.join(TRAJECTORY_COLUMNS)} FROM players WHERE name IN ({placeholders})",
+                            list(names)).fetchall()
+    finally:
+        conn.close()
+
+
+def _fan_out(fn, auction_ids, *args, workers=None):
+    """[(auction_id, fn(path, *args))] over the shards, in auction_ids order."""
+    auction_ids = list(db.list_auctions() if auction_ids is None else auction_ids)
+    paths = [db.auction_path(a) for a in auction_ids]
+    missing = [a for a, path in zip(auction_ids, paths) if not os.path.exists(path)]
+    if missing:
+        raise ValueError(f"No auction {missing[0]!r}")
+    workers = max(1, min(workers or _default_workers(len(paths)), len(paths) or 1))
+    if workers == 1:
+        results = [fn(path, *args) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(fn, paths, *([arg] * len(paths) for arg in args)))
+    return list(zip(auction_ids, results))
+
+
+def _with_averages(stats):
+    # Averages come from the merged sums; a role with no sales has no average price
+    stats['avg_price'] = (stats['total_spend'] / stats['sold'].where(stats['sold'] > 0)).round(1)
+    stats['avg_base_price'] = (stats['total_base_price'] / stats['players']).round(1)
+    return stats
+
+
+@db.profiled
+def role_prices(auction_ids=None, workers=None):
+    """
+    Sold/unsold counts, spend and average final price per role, for each
+    auction and merged across them. auction_ids: shards to include, in display
+    order (default: every shard).
+    Returns a dict with:
+        by_auction: one row per (auction, role)
+        overall: one row per role over all the auctions
+    """
+    partials = _fan_out(_role_partials, auction_ids, workers=workers)
+    rows = [(auction_id, *row) for auction_id, shard in partials for row in shard]
+    by_auction = pd.DataFrame(rows, columns=['auction', 'role'] + STAT_COLUMNS)
+    overall = by_auction.groupby('role', as_index=False).agg(
+        {col: 'max' if col == 'max_rating' else 'sum' for col in STAT_COLUMNS})
+    return {'by_auction': _with_averages(by_auction), 'overall': _with_averages(overall)}
+
+
+@db.profiled
+def price_trajectories(names, auction_ids=None, workers=None):
+    """
+    How the named players fared in each auction: one row per (player, auction)
+    they appear in, with base price, rating, outcome and final price. Players
+    are matched on name across shards and told apart by nationality.
+    """
+    names = sorted(set(names))
+    columns = ['auction'] + TRAJECTORY_COLUMNS
+    if not names:
+        return pd.DataFrame(columns=columns)
+    partials = _fan_out(_trajectory_rows, auction_ids, names, workers=workers)
+    rows = [(auction_id, *row) for auction_id, shard in partials for row in shard]
+    order = {auction_id: i for i, (auction_id, _) in enumerate(partials)}
+    trajectories = pd.DataFrame(rows, columns=columns)
+    return trajectories.sort_values(['name', 'nationality', 'auction'], key=lambda col: col.map(order)
+                                    if col.name == 'auction' else col, kind='stable').reset_index(drop=True)
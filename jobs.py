@@ -0,0 +1,267 @@
+"""
+Background jobs for long-running writes (auction simulation, bulk import).
+
+submit() records a queued job and runs it on a worker thread, so the
+Streamlit script that started it returns immediately and other sessions keep
+working. Jobs run one at a time: SQLite has a single writer, so a second worker
+would only wait on the lock.
+
+Job rows live in a small SQLite file next to the database they run against
+(<database>-jobs), not in the database itself. submit() inserts the row there
+and SQLite assigns the id, so ids are unique across processes, and submitting
+while a long import holds the database's write lock does not wait on it.
+
+A task is called as task(job, *args, **kwargs) and reports through
+job.report(fraction, message), which raises JobCancelled once cancel() has been
+called. Cancellation also interrupts the SQL statement in flight through
+SQLite's progress handler, so a long UPDATE stops without waiting for the next
+report. Either way the task's transaction rolls back.
+
+Live progress is held in memory by the process running the job, so reports
+cost nothing; the row gets the final progress when the job finishes.
+
+Under Pyodide (stlite) there are no threads, so jobs run inline in submit().
+"""
+import json
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+import database as db
+
+PROGRESS_OPCODES = 10_000  # SQLite VM steps between cancellation checks
+JOBS_SUFFIX = "-jobs"  # job rows of database X live in the file X-jobs
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """Handle passed to a running task."""
+
+    def __init__(self, job_id, kind):
+        self.id = job_id
+        self.kind = kind
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.progress = 0.0
+        self.message = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def report(self, fraction, message=None):
+        """Records progress (0-1); raises JobCancelled if the job was cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+
+_active = {}  # (database file, job id) -> Job, until the job's row is final
+_lock = threading.Lock()
+_executor = None
+
+
+def _inline():
+    return sys.platform == "emscripten"
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job")
+        return _executor
+
+
+@contextmanager
+def _connect(db_name):
+    """A short-lived connection to db_name's jobs file, committing on success."""
+    conn = sqlite3.connect(db_name + JOBS_SUFFIX, timeout=5)
+    try:
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    progress REAL NOT NULL DEFAULT 0,
+                    message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            ''')
+            yield conn
+    finally:
+        conn.close()
+
+
+def _record(db_name, job, **fields):
+    """Updates job's row in db_name's jobs file."""
+    with _connect(db_name) as conn:
+        conn.execute(f"UPDATE jobs SET {', '.join(f'{col} = ?' for col in fields)} WHERE id = ?",
+                     (*fields.values(), job.id))
+
+
+def _run(job, db_name, task, args, kwargs):
+    # The worker thread writes to the database the job was submitted against
+    with db.use_database(db_name):
+        _run_routed(job, db_name, task, args, kwargs)
+
+
+def _run_routed(job, db_name, task, args, kwargs):
+    status, result, error = 'cancelled', None, None
+    try:
+        if job.cancel_requested:
+            return
+        job.status = 'running'
+        _record(db_name, job, status='running', started_at=time.time())
+        with db.get_connection() as conn:
+            conn.set_progress_handler(lambda: int(job.cancel_requested), PROGRESS_OPCODES)
+            try:
+                result = task(job, *args, **kwargs)
+                status = 'done'
+                job.progress = 1.0
+            except JobCancelled:
+                pass
+            except Exception as e:
+                # An interrupted statement surfaces as OperationalError
+                if not (job.cancel_requested and isinstance(e, sqlite3.OperationalError)):
+                    status, error = 'failed', str(e)
+            finally:
+                conn.set_progress_handler(None, 0)
+    except sqlite3.Error as e:  # the start of the job could not be recorded
+        status, error = 'failed', str(e)
+    finally:
+        job.status = status
+        try:
+            _record(db_name, job, status=status, progress=job.progress, message=job.message,
+                    result=json.dumps(result, default=str) if result is not None else None,
+                    error=error, finished_at=time.time())
+        finally:
+            with _lock:
+                _active.pop((db_name, job.id), None)
+            job._finished.set()
+
+
+def submit(kind, task, *args, **kwargs):
+    """Queues task(job, *args, **kwargs) and returns the new job's id. Never waits on the write lock."""
+    db_name = db.database_name()
+    job = Job(None, kind)
+    with _connect(db_name) as conn:
+        job.id = conn.execute("INSERT INTO jobs (kind, created_at) VALUES (?, ?)",
+                              (kind, job.created_at)).lastrowid
+    with _lock:
+        _active[(db_name, job.id)] = job
+    if _inline():
+        _run(job, db_name, task, args, kwargs)
+    else:
+        _get_executor().submit(_run, job, db_name, task, args, kwargs)
+    return job.id
+
+
+def cancel(job_id):
+    """Asks a queued or running job to stop. False if it has already finished."""
+    with _lock:
+        job = _active.get((db.database_name(), job_id))
+    if job is None:
+        return False
+    job._cancel.set()
+    return True
+
+
+def _fetch(sql, params):
+    """Rows for sql from the jobs file, with live progress for running jobs."""
+    with _connect(db.database_name()) as conn:
+        cursor = conn.execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor]
+    for job in rows:
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        with _lock:
+            live = _active.get((db.database_name(), job['id']))
+        if live is not None and job['status'] == 'running':
+            job['progress'], job['message'] = live.progress, live.message
+        job['cancel_requested'] = live is not None and live.cancel_requested
+    return rows
+
+
+def get_job(job_id):
+    """The job as a dict (status, progress, message, result, error, timestamps), or None."""
+    rows = _fetch("SELECT * FROM jobs WHERE id = ?", (job_id,))
+    return rows[0] if rows else None
+
+
+def list_jobs(limit=20):
+    """Most recent jobs first."""
+    return pd.DataFrame(_fetch("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)),
+                        columns=['id', 'kind', 'status', 'progress', 'message', 'result', 'error',
+                                 'created_at', 'started_at', 'finished_at', 'cancel_requested'])
+
+
+def wait(job_id, timeout=None):
+    """Blocks until the job finishes (or timeout seconds pass) and returns get_job()."""
+    with _lock:
+        job = _active.get((db.database_name(), job_id))
+    if job is not None:
+        job._finished.wait(timeout)
+    return get_job(job_id)
+
+
+# --- Tasks ---
+# simulate_auction stage -> (share of its run time done by the end of it, message)
+SIMULATE_STAGES = {
+    'draw': (0.4, "Logging events..."),
+    'events': (0.55, "Updating players..."),
+    'update': (0.75, "Updating stats..."),
+}
+
+
+def _simulate_task(job, seed=None):
+    job.report(0.0, "Drawing outcomes...")
+    count = db.simulate_auction(seed=seed, progress=lambda stage: job.report(*SIMULATE_STAGES[stage]))
+    job.message = f"Updated {count:,} players"
+    return {'players': count}
+
+
+def _import_task(job, source):
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return _import_task(job, f)
+    if isinstance(source, pd.DataFrame):
+        def fraction(rows):
+            return rows / len(source) if len(source) else 1.0
+    else:
+        # File-like: bytes parsed so far over bytes to parse
+        start = source.tell()
+        size = source.seek(0, 2) - start
+        source.seek(start)
+
+        def fraction(rows):
+            return (source.tell() - start) / size if size else 1.0
+
+    def report(rows):
+        job.report(fraction(rows), f"Imported {rows:,} rows...")
+    return {'rows': db.bulk_import(source, progress=report)}
+
+
+def submit_simulation(seed=None):
+    return submit('simulate_auction', _simulate_task, seed=seed)
+
+
+def submit_import(source):
+    """source: DataFrame, CSV path or file-like, as for database.bulk_import."""
+    return submit('bulk_import', _import_task, source)
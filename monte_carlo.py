@@ -0,0 +1,130 @@
+"""
+Read-only Monte Carlo auction forecasts.
+
+Runs many independent auctions over the Available players using the same rule
+as database.simulate_auction, without writing anything back. Iterations are
+split across a process pool; each worker draws from its own SeedSequence stream,
+so a given (seed, workers) pair always reproduces the same forecast.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import database as db
+
+BLOCK_SIZE = 256  # auctions drawn per vectorized step in a worker
+PERCENTILES = (10, 50, 90)
+
+
+def _price_bounds(base, rating):
+    """Lowest and highest possible sold price per player (multiplier draw of 1 and 4)."""
+    low = 5 * np.round(np.trunc(base * (1 + rating / 10)) / 5)
+    high = 5 * np.round(np.trunc(base * (1 + rating / 10 * 4)) / 5)
+    return low.astype(np.int64), high.astype(np.int64)
+
+
+def _simulate_block(base, rating, role_idx, n_roles, iterations, seed_seq):
+    """
+    Runs `iterations` auctions in one worker and returns mergeable partial sums:
+    sold counts, price sums, per-player price histograms (5-lakh bins) and
+    total spend per role.
+    """
+    rng = np.random.default_rng(seed_seq)
+    n = len(base)
+    low, high = _price_bounds(base, rating)
+    n_bins = int(((high - low) // 5).max()) + 1 if n else 1
+    offsets = np.arange(n) * n_bins
+
+    sold_count = np.zeros(n, dtype=np.int64)
+    price_sum = np.zeros(n, dtype=np.float64)
+    hist = np.zeros(n * n_bins, dtype=np.int64)
+    role_spend = np.zeros(n_roles, dtype=np.float64)
+
+    done = 0
+    while done < iterations:
+        k = min(BLOCK_SIZE, iterations - done)
+        sold, price = db._auction_outcomes(base, rating, rng, size=(k, n))
+        sold_count += sold.sum(axis=0)
+        price_sum += price.sum(axis=0)
+        role_spend += np.bincount(role_idx, weights=price.sum(axis=0), minlength=n_roles)
+        rows, cols = np.nonzero(sold)
+        bins = (price[rows, cols] - low[cols]) // 5
+        hist += np.bincount(offsets[cols] + bins, minlength=n * n_bins)
+        done += k
+    return sold_count, price_sum, hist.reshape(n, n_bins), role_spend
+
+
+def _percentile_prices(hist, low, sold_count, pct):
+    """Smallest binned price whose cumulative share of sales reaches pct."""
+    cumulative = hist.cumsum(axis=1)
+    target = np.ceil(sold_count * pct / 100).clip(min=1)[:, None]
+    first_bin = (cumulative < target).sum(axis=1)
+    return np.where(sold_count > 0, low + 5 * first_bin, np.nan)
+
+
+def _default_workers():
+    if sys.platform == "emscripten":
+        return 1  # Pyodide (stlite) has no subprocesses
+    return os.cpu_count() or 1
+
+
+@db.profiled
+def run_monte_carlo(iterations=1000, seed=None, workers=None, filters=None):
+    """
+    Forecasts auction outcomes for the Available players matching filters.
+
+    Returns a dict with:
+        players: one row per player with sell_probability, mean_price
+                 (average when sold) and p10/p50/p90 sold prices
+        role_spend: expected total spend per role across an auction
+        iterations: number of simulated auctions
+    """
+    pool = db.fetch_players({**(filters or {}), 'auction_status': ['Available']})
+    if pool.empty or iterations <= 0:
+        return {'players': pool, 'role_spend': pd.DataFrame(columns=['role', 'expected_spend']),
+                'iterations': 0}
+
+    base = pool['base_price'].to_numpy(dtype=np.int64)
+    rating = pool['skill_rating'].to_numpy(dtype=np.int64)
+    role_idx, role_names = pd.factorize(pool['role'])
+
+    workers = max(1, min(workers or _default_workers(), iterations))
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    shares = [iterations // workers + (i < iterations % workers) for i in range(workers)]
+    args = [(base, rating, role_idx, len(role_names), share, s) for share, s in zip(shares, seeds)]
+
+    if workers == 1:
+        partials = [_simulate_block(*args[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(_simulate_block, *zip(*args)))
+
+    sold_count = sum(p[0] for p in partials)
+    price_sum = sum(p[1] for p in partials)
+    hist = sum(p[2] for p in partials)
+    role_spend = sum(p[3] for p in partials)
+
+    low, _ = _price_bounds(base, rating)
+    result = pool[['id', 'name', 'role', 'nationality', 'base_price', 'skill_rating']].copy()
+    result['sell_probability'] = sold_count / iterations
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['mean_price'] = np.where(sold_count > 0, price_sum / sold_count, np.nan)
+    for pct in PERCENTILES:
+        result[f'p{pct}_price'] = _percentile_prices(hist, low, sold_count, pct)
+
+    return {
+        'players': result,
+        'role_spend': pd.DataFrame({'role': role_names, 'expected_spend': role_spend / iterations}),
+        'iterations': iterations,
+    }
+
+
+if __name__ == "__main__":
+    import time
+    start = time.perf_counter()
+    forecast = run_monte_carlo(iterations=1000, seed=0)
+    print(forecast['players'].head(10).to_string(index=False))
+    print(forecast['role_spend'].to_string(index=False))
+    print(f"{forecast['iterations']} auctions in {time.perf_counter() - start:.2f}s")
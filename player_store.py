@@ -0,0 +1,147 @@
+"""
+Optional in-process columnar snapshot of the players table.
+
+Holds every player in compact NumPy columns (categoricals for role, nationality
+and auction_status; the narrowest integer type that fits for ratings, ages and
+prices) and evaluates Player Discovery filters as boolean masks, without a
+round trip to SQLite. The snapshot is rebuilt whenever database.py's write
+generation moves on, so it never serves data older than the last write.
+
+fetch_players_page() and count_players() mirror the database.py functions of
+the same name, so callers can switch between the two.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import database as db
+
+CATEGORY_COLUMNS = ['nationality', 'role', 'auction_status', 'current_team']
+INTEGER_COLUMNS = ['id', 'age', 'matches_played', 'base_price', 'skill_rating', 'final_price',
+                   'current_bid']
+REAL_COLUMNS = ['strike_rate', 'economy_rate'] + db.SCORE_COLUMNS  # scores are stored to 4 decimals
+
+
+class PlayerSnapshot:
+    """Columnar copy of players taken at one write generation."""
+
+    def __init__(self, frame, generation):
+        self.generation = generation
+        self.frame = _compact(frame)
+        self._order_cache = {}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def memory_usage(self):
+        """Bytes held by the snapshot's columns, including string payloads."""
+        return int(self.frame.memory_usage(deep=True, index=False).sum())
+
+    def mask(self, filters=None):
+        """Boolean mask of the rows matching a database.py-style filter dict."""
+        frame = self.frame
+        mask = np.ones(len(frame), dtype=bool)
+        if not filters:
+            return mask
+        for col in ('role', 'nationality', 'auction_status'):
+            if filters.get(col):
+                # Compare category codes, not strings
+                codes = frame[col].cat.categories.get_indexer(list(filters[col]))
+                mask &= np.isin(frame[col].cat.codes.to_numpy(), codes[codes >= 0])
+        prices = frame['base_price'].to_numpy()
+        if filters.get('price_min') is not None:
+            mask &= prices >= filters['price_min']
+        if filters.get('price_max') is not None:
+            mask &= prices <= filters['price_max']
+        if filters.get('rating_min') is not None:
+            mask &= frame['skill_rating'].to_numpy() >= filters['rating_min']
+        for score in db.SCORE_COLUMNS:
+            if filters.get(f'{score}_min') is not None:
+                # float32 holds the 4-decimal scores closely enough to compare after rounding
+                mask &= frame[score].to_numpy(dtype=np.float64).round(4) >= filters[f'{score}_min']
+        if filters.get('search'):
+            # Only test names that survived the cheaper filters (case-insensitive, like LIKE)
+            candidates = np.flatnonzero(mask)
+            names = frame['name'].iloc[candidates]
+            hits = names.str.contains(filters['search'], case=False, regex=False).to_numpy(dtype=bool)
+            mask[:] = False
+            mask[candidates[hits]] = True
+        return mask
+
+    def _order(self, sort_by):
+        """Row positions sorted by (sort_by, id); computed once per snapshot."""
+        if sort_by not in self._order_cache:
+            keys = self.frame[sort_by]
+            if keys.dtype == object:
+                keys = keys.rank(method='dense')  # lexsort needs a comparable numeric key
+            self._order_cache[sort_by] = np.lexsort((self.frame['id'].to_numpy(), keys.to_numpy()))
+        return self._order_cache[sort_by]
+
+    def fetch_page(self, filters=None, sort_by='id', descending=False, page_size=50, cursor=None):
+        if sort_by not in db.SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_by!r}; choose one of {db.SORT_COLUMNS}")
+        order = self._order(sort_by)
+        if descending:
+            order = order[::-1]
+        matching = order[self.mask(filters)[order]]
+        offset = cursor or 0
+        rows = matching[offset:offset + page_size]
+        next_cursor = offset + page_size if offset + page_size < len(matching) else None
+        return _expand(self.frame.iloc[rows]), next_cursor
+
+    def count(self, filters=None):
+        return int(self.mask(filters).sum())
+
+
+def _compact(frame):
+    out = pd.DataFrame(index=pd.RangeIndex(len(frame)))
+    out['name'] = frame['name'].to_numpy(dtype=object)
+    for col in CATEGORY_COLUMNS:
+        out[col] = frame[col].astype('category')
+    for col in INTEGER_COLUMNS:
+        out[col] = pd.to_numeric(frame[col].fillna(0), downcast='integer')
+    for col in REAL_COLUMNS:
+        out[col] = frame[col].astype('float32')
+    return out
+
+
+def _expand(frame):
+    """Back to the column order and plain dtypes database.fetch_players returns."""
+    out = frame.reset_index(drop=True)
+    for col in CATEGORY_COLUMNS:
+        out[col] = out[col].astype(object).where(out[col].notna(), None)  # NULL reads back as None
+    for col in INTEGER_COLUMNS:
+        out[col] = out[col].astype('int64')
+    for col in REAL_COLUMNS:
+        out[col] = out[col].astype('float64').round(4)
+    return out[['id', 'name', 'nationality', 'role', 'age', 'matches_played', 'strike_rate',
+                'economy_rate', 'base_price', 'skill_rating', 'auction_status', 'final_price',
+                'current_bid', 'current_team'] + db.SCORE_COLUMNS]
+
+
+_snapshots = {}
+_lock = threading.Lock()
+
+
+@db.profiled
+def get_snapshot():
+    """
+    Returns the snapshot for database.database_name(), rebuilding it first if a write
+    has happened since it was taken.
+    """
+    generation = db.write_generation()
+    with _lock:
+        snapshot = _snapshots.get(db.database_name())
+        if snapshot is None or generation is None or snapshot.generation != generation:
+            snapshot = PlayerSnapshot(db.fetch_players(), generation)
+            _snapshots[db.database_name()] = snapshot
+        return snapshot
+
+
+def fetch_players_page(filters=None, sort_by='id', descending=False, page_size=50, cursor=None):
+    """Same contract as database.fetch_players_page; the cursor is a row offset."""
+    return get_snapshot().fetch_page(filters, sort_by, descending, page_size, cursor)
+
+
+def count_players(filters=None):
+    return get_snapshot().count(filters)
@@ -0,0 +1,174 @@
+"""
+Fair-value pricing: what a player can be expected to sell for.
+
+A linear regression of final_price on role, nationality, skill_rating,
+strike_rate, economy_rate, age and matches_played, fitted over every sale in
+the auction history (auction_events rows with status Sold). Earlier rounds
+therefore keep counting after reset_auction. Role and nationality are one-hot
+columns against the first category of each.
+
+The model keeps only the sufficient statistics of the fit, X'X and X'y, and
+solves the normal equations for the coefficients. New sales are folded in by
+adding their rows' products, so catching up after a round costs O(new sales),
+and the solve is a features x features system however long the history.
+It follows database.py's write generation and refits from scratch only when
+an upsert rewrote player stats (the feature_updates counter in meta) or a
+sale names a role or nationality the model has no column for.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import database as db
+
+NUMERIC = ['skill_rating', 'strike_rate', 'economy_rate', 'age', 'matches_played']
+CATEGORICAL = ['role', 'nationality']
+
+
+class PriceModel:
+    """Least-squares price model over a fixed set of columns, refitted from running sums."""
+
+    def __init__(self, categories):
+        self.categories = categories  # column -> sorted values; the first is the baseline
+        self.columns = ['intercept'] + NUMERIC + [f"{col}={value}" for col in CATEGORICAL
+                                                  for value in categories[col][1:]]
+        width = len(self.columns)
+        self.xtx = np.zeros((width, width))
+        self.xty = np.zeros(width)
+        self.yty = 0.0
+        self.sales = 0
+        self.coefficients = np.zeros(width)
+        self.generation = None
+        self.feature_updates = None
+        self.last_event = 0
+
+    @property
+    def ready(self):
+        """Whether there are more sales than coefficients to fit."""
+        return self.sales > len(self.columns)
+
+    def design(self, players):
+        """Design matrix rows for a frame of players; unknown categories fall to the baseline."""
+        x = np.zeros((len(players), len(self.columns)))
+        x[:, 0] = 1.0
+        x[:, 1:1 + len(NUMERIC)] = players[NUMERIC].fillna(0).to_numpy(dtype=np.float64)
+        offset = 1 + len(NUMERIC)
+        for col in CATEGORICAL:
+            codes = pd.Categorical(players[col], categories=self.categories[col]).codes
+            rows = np.flatnonzero(codes > 0)
+            x[rows, offset + codes[rows] - 1] = 1.0
+            offset += len(self.categories[col]) - 1
+        return x
+
+    def covers(self, players):
+        """True if every role and nationality in players has a column (or is the baseline)."""
+        return all(players[col].isin(self.categories[col]).all() for col in CATEGORICAL)
+
+    def add_sales(self, sales):
+        """Folds sold rows (features plus final_price) into the fit."""
+        if sales.empty:
+            return
+        x = self.design(sales)
+        y = sales['final_price'].to_numpy(dtype=np.float64)
+        self.xtx += x.T @ x
+        self.xty += x.T @ y
+        self.yty += y @ y
+        self.sales += len(y)
+        # Minimum-norm solution: a category with no sales yet gets a zero coefficient
+        self.coefficients = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+
+    def r_squared(self):
+        """Share of the variance in sale prices the fit explains, from the running sums."""
+        if not self.ready:
+            return float('nan')
+        b = self.coefficients
+        residual = self.yty - 2 * b @ self.xty + b @ self.xtx @ b
+        total = self.yty - self.xty[0] ** 2 / self.sales  # xty[0] is the sum of prices
+        return float(1 - residual / total) if total > 0 else float('nan')
+
+    def predict(self, players):
+        """Expected sale prices for a frame of players, all in one matrix multiply (NaN until ready)."""
+        if not self.ready:
+            return np.full(len(players), np.nan)
+        return self.design(players) @ self.coefficients
+
+    def coefficient_table(self):
+        return pd.DataFrame({'column': self.columns, 'coefficient': self.coefficients.round(3)})
+
+
+_SALES_SQL = f'''
+    SELECT {', '.join(f'p.{col}' for col in CATEGORICAL + NUMERIC)}, e.final_price
+    FROM auction_events e JOIN players p ON p.id = e.player_id
+    WHERE e.id > ? AND e.id <= ? AND e.auction_status = 'Sold'
+'''
+
+
+def _categories(conn):
+    return {col: [row[0] for row in conn.execute(
+                f"SELECT DISTINCT {col} FROM players WHERE {col} IS NOT NULL ORDER BY {col}")]
+            for col in CATEGORICAL}
+
+
+def _refresh(model, conn, generation):
+    """Catches model up with the sales logged since it last looked; a new model when a refit is needed."""
+    feature_updates = conn.execute("SELECT value FROM meta WHERE key = 'feature_updates'").fetchone()[0]
+    head = conn.execute("SELECT COALESCE(MAX(id), 0) FROM auction_events").fetchone()[0]
+    if model is not None and model.feature_updates == feature_updates and model.last_event <= head:
+        sales = pd.read_sql_query(_SALES_SQL, conn, params=(model.last_event, head))
+        if model.covers(sales):
+            model.add_sales(sales)
+            model.last_event, model.generation = head, generation
+            return model
+    model = PriceModel(_categories(conn))
+    model.add_sales(pd.read_sql_query(_SALES_SQL, conn, params=(0, head)))
+    model.feature_updates, model.last_event, model.generation = feature_updates, head, generation
+    return model
+
+
+_models = {}
+_lock = threading.Lock()
+
+
+@db.profiled
+def get_model():
+    """Returns the price model for database.database_name(), caught up with any new sales."""
+    with db.get_connection() as conn:
+        generation = db._write_generation(conn)
+        with _lock:
+            model = _models.get(db.database_name())
+            if model is None or generation is None or model.generation != generation:
+                model = _models[db.database_name()] = _refresh(model, conn, generation)
+            return model
+
+
+def with_fair_value(players):
+    """
+    players (e.g. a fetch_players_page result) plus two columns:
+        predicted_price: what the model expects the player to sell for
+        value_gap: final_price if Sold, else base_price, minus predicted_price.
+            Above zero the player costs more than comparable players sell for.
+    """
+    predicted = get_model().predict(players).round(1)
+    asking = np.where(players['auction_status'] == 'Sold', players['final_price'], players['base_price'])
+    return players.assign(predicted_price=predicted, value_gap=(asking - predicted).round(1))
+
+
+@db.profiled
+def score_available(filters=None):
+    """
+    Every Available player matching filters with predicted_price and value_gap,
+    scored in one matrix multiply, best value (most negative gap) first.
+    """
+    model = get_model()
+    with db.read_connection() as conn:
+        query, params = db._players_query(conn, {**(filters or {}), 'auction_status': ['Available']},
+                                          columns=', '.join(['id', 'name', 'base_price'] + CATEGORICAL + NUMERIC))
+        key = ('score_available', model.feature_updates, model.last_event, db._normalize_filters(filters))
+        return db._cached_read(conn, key, lambda: _score(model, pd.read_sql_query(query, conn, params=params)))
+
+
+def _score(model, players):
+    predicted = model.predict(players)
+    scored = players.assign(predicted_price=predicted.round(1),
+                            value_gap=(players['base_price'] - predicted).round(1))
+    return scored.sort_values(['value_gap', 'id'], kind='stable').reset_index(drop=True)
@@ -0,0 +1,196 @@
+"""
+Similar players: the nearest neighbours of a player over their stat line.
+
+Each player is a vector of FEATURES, z-scored within their role so that no
+single stat dominates because of its units. Players are indexed per role, and
+comparables come from the target's role unless the filters name other roles.
+With scipy installed each role gets a cKDTree. Without it the search is a
+NumPy distance scan over the role, which stays under a millisecond at 100k
+players.
+
+The index follows database.py's write generation. After a write it reads only
+the players with ids above the last one it indexed, and rebuilds from scratch
+if rows went missing or an upsert rewrote existing players' stats (the
+feature_updates counter in meta). New players are z-scored with their role's
+scaling as of its last rebuild and kept in a small buffer searched by brute
+force; once the buffer outgrows REBUILD_FRACTION of the role, the role is
+rescaled and its tree rebuilt. Until then distances to or from new players use
+the slightly older scaling.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import database as db
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional; brute force is fast enough at this scale
+    cKDTree = None
+
+FEATURES = ['strike_rate', 'economy_rate', 'skill_rating', 'age', 'matches_played']
+FILTER_BATCH = 256  # nearest neighbours checked against filters before ranking the whole role
+REBUILD_FRACTION = 0.1  # buffered new players, as a share of the indexed ones, before a rebuild
+
+
+class _RoleIndex:
+    """
+    Players of one role: raw and scaled feature rows, plus a tree when scipy is
+    available. Players added since the last rebuild are buffered in new_ids.
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.raw = np.empty((0, len(FEATURES)))
+        self.new_ids, self.new_raw = self.ids, self.raw
+        self._rebuild()
+
+    def __len__(self):
+        return len(self.ids) + len(self.new_ids)
+
+    def extend(self, ids, raw):
+        self.new_ids = np.concatenate([self.new_ids, ids])
+        self.new_raw = np.vstack([self.new_raw, raw])
+        if len(self.new_ids) > REBUILD_FRACTION * len(self.ids):
+            self._rebuild()
+        else:
+            self.new_points = (self.new_raw - self.mean) / self.std
+
+    def _rebuild(self):
+        """Folds the buffer in, rescales the role and rebuilds the tree."""
+        self.ids = np.concatenate([self.ids, self.new_ids])
+        self.raw = np.vstack([self.raw, self.new_raw])
+        self.new_ids, self.new_raw = self.ids[:0], self.raw[:0]
+        self.mean = self.raw.mean(axis=0) if len(self.raw) else np.zeros(len(FEATURES))
+        std = self.raw.std(axis=0) if len(self.raw) else np.ones(len(FEATURES))
+        self.std = np.where(std > 0, std, 1.0)  # e.g. economy_rate is 0.0 for every batsman
+        self.points = (self.raw - self.mean) / self.std
+        self.new_points = self.points[:0]
+        self.sq_norms = np.einsum('ij,ij->i', self.points, self.points)
+        self.tree = cKDTree(self.points) if cKDTree is not None and len(self.points) else None
+
+    def nearest(self, vector, k):
+        """(ids, distances) of the k players nearest to a raw feature vector, closest first."""
+        k = min(k, len(self))
+        if k == 0:
+            return self.ids[:0], np.empty(0)
+        query = (vector - self.mean) / self.std
+        ids, distances = self._indexed_nearest(query, min(k, len(self.ids)))
+        if len(self.new_ids):
+            new_distances = np.sqrt(((self.new_points - query) ** 2).sum(axis=1))
+            ids = np.concatenate([ids, self.new_ids])
+            distances = np.concatenate([distances, new_distances])
+            order = np.lexsort((ids, distances))[:k]
+            ids, distances = ids[order], distances[order]
+        return ids, distances
+
+    def _indexed_nearest(self, query, k):
+        if k == 0:
+            return self.ids[:0], np.empty(0)
+        if self.tree is not None:
+            distances, positions = self.tree.query(query, k=k)
+            return self.ids[np.atleast_1d(positions)], np.atleast_1d(distances)
+        sq = self.sq_norms - 2 * (self.points @ query) + query @ query
+        positions = np.argpartition(sq, k - 1)[:k] if k < len(sq) else np.arange(len(sq))
+        positions = positions[np.argsort(sq[positions], kind='stable')]
+        return self.ids[positions], np.sqrt(np.maximum(sq[positions], 0.0))
+
+
+class SimilarityIndex:
+    """Per-role nearest-neighbour indexes over every player, at one write generation."""
+
+    def __init__(self):
+        self.generation = None
+        self.feature_updates = None
+        self.last_id = 0
+        self.size = 0
+        self.roles = {}
+        self._where = {}  # player id -> (role, feature row)
+
+    def refresh(self, conn, generation):
+        feature_updates = conn.execute("SELECT value FROM meta WHERE key = 'feature_updates'").fetchone()[0]
+        if self.size:
+            indexed = conn.execute("SELECT COUNT(*) FROM players WHERE id <= ?", (self.last_id,)).fetchone()[0]
+            if indexed != self.size or feature_updates != self.feature_updates:
+                self.__init__()
+        self.feature_updates = feature_updates
+        new = pd.read_sql_query(f"SELECT id, role, {', '.join(FEATURES)} FROM players WHERE id > ? ORDER BY id",
+                                conn, params=(self.last_id,))
+        for role, group in new.groupby('role', sort=False):
+            ids = group['id'].to_numpy(dtype=np.int64)
+            raw = group[FEATURES].fillna(0).to_numpy(dtype=np.float64)
+            self.roles.setdefault(role, _RoleIndex()).extend(ids, raw)
+            self._where.update(zip(ids.tolist(), ((role, row) for row in raw)))
+        if len(new):
+            self.last_id = int(new['id'].iloc[-1])
+            self.size += len(new)
+        self.generation = generation
+
+    def role_of(self, player_id):
+        if player_id not in self._where:
+            raise ValueError(f"No player with id {player_id}")
+        return self._where[player_id][0]
+
+    def neighbours(self, player_id, k, roles=None):
+        """(ids, distances) of the k nearest players in roles (default: the player's own), closest first."""
+        role = self.role_of(player_id)
+        vector = self._where[player_id][1]
+        found = [self.roles[r].nearest(vector, k + 1) for r in (roles or [role]) if r in self.roles]
+        if not found:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ids = np.concatenate([f[0] for f in found])
+        distances = np.concatenate([f[1] for f in found])
+        order = np.lexsort((ids, distances))
+        ids, distances = ids[order], distances[order]
+        keep = ids != player_id
+        return ids[keep][:k], distances[keep][:k]
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+@db.profiled
+def get_index():
+    """Returns the index for database.database_name(), catching up with any writes first."""
+    with db.get_connection() as conn:
+        generation = db._write_generation(conn)
+        with _lock:
+            index = _indexes.setdefault(db.database_name(), SimilarityIndex())
+            if generation is None or index.generation != generation:
+                index.refresh(conn, generation)
+            return index
+
+
+@db.profiled
+def similar_players(player_id, k=5, filters=None):
+    """
+    The k players most like player_id, closest first, as fetch_players rows
+    with a distance column. filters: a database.py filter dict. Its role list
+    picks which roles to search (default: the player's own), and the other
+    keys (e.g. auction_status=['Available']) restrict the results.
+    """
+    filters = dict(filters or {})
+    index = get_index()
+    roles = filters.pop('role', None) or [index.role_of(player_id)]
+    restricted = any(value not in (None, '', []) for value in filters.values())
+    with db.get_connection() as conn:
+        query, params = db._players_query(conn, filters)
+
+        def fetch(ids):
+            placeholders = ','.join('?' for _ in ids)
+            return pd.read_sql_query(f"{query} AND id IN ({placeholders})", conn, params=params + ids.tolist())
+
+        ids, distances = index.neighbours(player_id, max(k, FILTER_BATCH) if restricted else k, roles)
+        rows = fetch(ids)
+        if restricted and len(rows) < k and len(ids) >= FILTER_BATCH:
+            # Selective filters: rank the whole role and keep what the filters allow
+            allowed_query, allowed_params = db._players_query(conn, {**filters, 'role': roles}, columns='id')
+            allowed = np.array([row[0] for row in conn.execute(allowed_query, allowed_params)], dtype=np.int64)
+            ids, distances = index.neighbours(player_id, index.size, roles)
+            keep = np.isin(ids, allowed)
+            ids, distances = ids[keep][:k], distances[keep][:k]
+            rows = fetch(ids)
+    position = pd.Series(np.arange(len(ids)), index=ids)[rows['id']].to_numpy()
+    rows = rows.assign(distance=distances[position].round(4)).iloc[np.argsort(position)]
+    return rows.head(k).reset_index(drop=True)
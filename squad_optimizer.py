@@ -0,0 +1,235 @@
+"""
+Best squad for a purse: pick squad_size players that maximize total
+skill_rating while staying within budget, with at least min_bowlers Bowlers and
+min_keepers Wicketkeepers, and at most max_overseas players from outside
+HOME_NATION.
+
+Candidates are first pruned by k-dominance. Players split into classes that
+the constraints treat alike (bowler, keeper or other; home or overseas). A
+player can be dropped if at least k others in the same class are no worse on
+both rating and price, where k is the most players an optimal squad could take
+from that class. Whatever the pool size, this leaves at most about
+classes x rating levels x k players.
+
+The survivors go through an exact dynamic program. It tracks the minimum cost
+for each (players picked, bowlers, keepers, overseas, rating total) state, with
+the bowler and keeper counts capped at their minimums. When the state space
+times the candidates would exceed EXACT_WORK_LIMIT (very large squads), a
+greedy heuristic is used instead. It runs a Lagrangian price penalty found by
+bisection, then an upgrade pass that spends the leftover purse.
+"""
+import numpy as np
+
+HOME_NATION = 'India'
+EXACT_WORK_LIMIT = 60_000_000  # DP cells updated (candidates x states); well under a second
+
+
+def _classes(pool, home_nation):
+    role = np.where(pool['role'] == 'Bowler', 0, np.where(pool['role'] == 'Wicketkeeper', 1, 2))
+    overseas = (pool['nationality'].fillna(home_nation) != home_nation).to_numpy()
+    return role, overseas
+
+
+def prune_candidates(pool, squad_size, max_overseas, price_col='base_price', home_nation=HOME_NATION):
+    """
+    Drops players dominated by at least k others of their class, k being how many
+    a squad can take from that class. Never removes a player some optimal squad needs.
+    """
+    if pool.empty:
+        return pool
+    role, overseas = _classes(pool, home_nation)
+    rating = pool['skill_rating'].to_numpy()
+    price = pool[price_col].to_numpy()
+    keep = np.zeros(len(pool), dtype=bool)
+    for cls in np.unique(role * 2 + overseas):
+        idx = np.flatnonzero(role * 2 + overseas == cls)
+        k = min(squad_size, max_overseas) if cls % 2 else squad_size
+        # Cheapest first, best rating first among equal prices: every dominator precedes
+        idx = idx[np.lexsort((-rating[idx], price[idx]))]
+        r = rating[idx]
+        dominators = np.empty(len(idx), dtype=np.int64)
+        for level in np.unique(r):
+            at_or_above = np.cumsum(r >= level)
+            dominators[r == level] = at_or_above[r == level] - 1
+        keep[idx[dominators < k]] = True
+    return pool[keep]
+
+
+def _shift(cost, axis, step):
+    out = np.full_like(cost, np.inf)
+    if step < cost.shape[axis]:
+        dst = [slice(None)] * cost.ndim
+        src = [slice(None)] * cost.ndim
+        dst[axis] = slice(step, None)
+        src[axis] = slice(0, cost.shape[axis] - step)
+        out[tuple(dst)] = cost[tuple(src)]
+    return out
+
+
+def _bit(packed, index):
+    return (packed[index >> 3] >> (7 - (index & 7))) & 1
+
+
+def _solve_exact(rating, price, role, overseas, budget, squad_size, min_bowlers, min_keepers, max_overseas):
+    """Min cost per (count, bowlers, keepers, overseas, rating) state; returns chosen positions or None."""
+    max_total = int(np.sort(rating)[::-1][:squad_size].sum())
+    shape = (squad_size + 1, min_bowlers + 1, min_keepers + 1, max_overseas + 1, max_total + 1)
+    cost = np.full(shape, np.inf)
+    cost[0, 0, 0, 0, 0] = 0.0
+    taken, saturated = [], []
+
+    for r, p, cls, over in zip(rating, price, role, overseas):
+        moved = _shift(cost, 0, 1)
+        if over:
+            moved = _shift(moved, 3, 1)
+        moved = _shift(moved, 4, int(r))
+        from_top = None
+        if cls < 2:
+            # Bowler/keeper counts saturate at the minimum: the top index is reached
+            # from just below (regular shift) or from the top itself
+            axis = 1 + cls
+            top = [slice(None)] * 5
+            top[axis] = shape[axis] - 1
+            top = tuple(top)
+            stay = moved[top].copy()
+            if shape[axis] > 1:
+                moved = _shift(moved, axis, 1)
+                from_top = stay < moved[top]
+                moved[top] = np.minimum(moved[top], stay)
+            else:
+                from_top = np.ones_like(stay, dtype=bool)
+        moved += p
+        better = moved < cost
+        np.copyto(cost, moved, where=better)
+        taken.append(np.packbits(better))
+        saturated.append(np.packbits(from_top) if from_top is not None else None)
+
+    final = cost[squad_size, min_bowlers, min_keepers]  # (overseas, rating)
+    feasible = np.argwhere(final <= budget)
+    if not len(feasible):
+        return None
+    best_rating = feasible[:, 1].max()
+    over_count = min((o for o, t in feasible if t == best_rating), key=lambda o: final[o, best_rating])
+    state = [squad_size, min_bowlers, min_keepers, int(over_count), int(best_rating)]
+
+    chosen = []
+    for i in range(len(rating) - 1, -1, -1):
+        if not _bit(taken[i], np.ravel_multi_index(state, shape)):
+            continue
+        chosen.append(i)
+        cls = role[i]
+        if cls < 2:
+            axis = 1 + cls
+            at_top = state[axis] == shape[axis] - 1
+            top_shape = shape[:axis] + shape[axis + 1:]
+            top_state = state[:axis] + state[axis + 1:]
+            stayed = at_top and _bit(saturated[i], np.ravel_multi_index(top_state, top_shape))
+            if not stayed:
+                state[axis] -= 1
+        state[0] -= 1
+        state[3] -= int(overseas[i])
+        state[4] -= int(rating[i])
+    return chosen[::-1]
+
+
+def _select_greedy(order, role, overseas, squad_size, min_bowlers, min_keepers, max_overseas):
+    """Walks candidates in order, keeping slots free for the bowlers and keepers still needed."""
+    picked, need = [], [min_bowlers, min_keepers]
+    n_overseas = 0
+    for i in order:
+        if overseas[i] and n_overseas >= max_overseas:
+            continue
+        cls = role[i]
+        fills_need = cls < 2 and need[cls] > 0
+        if not fills_need and squad_size - len(picked) <= need[0] + need[1]:
+            continue
+        picked.append(i)
+        n_overseas += overseas[i]
+        if fills_need:
+            need[cls] -= 1
+        if len(picked) == squad_size:
+            return picked
+    return None
+
+
+def _solve_greedy(rating, price, role, overseas, budget, squad_size, min_bowlers, min_keepers, max_overseas,
+                  iterations=40):
+    """Lagrangian greedy: bisect the price penalty for the best squad that fits, then upgrade."""
+    best, best_rating = None, -1
+    low, high = 0.0, float(rating.max()) / max(float(price[price > 0].min(initial=1.0)), 1e-9) + 1.0
+    for _ in range(iterations):
+        penalty = (low + high) / 2
+        # Ties go to the cheaper player
+        order = np.lexsort((price, -(rating - penalty * price)))
+        picked = _select_greedy(order, role, overseas, squad_size, min_bowlers, min_keepers, max_overseas)
+        if picked is None or price[picked].sum() > budget:
+            low = penalty
+            continue
+        high = penalty
+        if rating[picked].sum() > best_rating:
+            best, best_rating = picked, rating[picked].sum()
+    if best is None:
+        return None
+
+    # Upgrade pass: swap a pick for a better one of the same class that the leftover purse covers
+    chosen = set(best)
+    improved = True
+    while improved:
+        improved = False
+        left = budget - price[list(chosen)].sum()
+        for i in sorted(chosen, key=lambda i: rating[i]):
+            same = (role == role[i]) & (overseas == overseas[i]) & (rating > rating[i]) & (price <= price[i] + left)
+            same[list(chosen)] = False
+            if same.any():
+                j = int(np.flatnonzero(same)[np.lexsort((price[same], -rating[same]))[0]])
+                chosen.remove(i)
+                chosen.add(j)
+                improved = True
+                break
+    return sorted(chosen)
+
+
+def optimize_squad(candidates, budget, squad_size=11, min_bowlers=4, min_keepers=1, max_overseas=4,
+                   price_col='base_price', home_nation=HOME_NATION, method='auto'):
+    """
+    Best squad from candidates (a fetch_players-style DataFrame) for budget lakhs.
+    price_col: column holding what each player is expected to cost.
+    method: 'auto' (exact unless too large), 'exact' or 'greedy'.
+
+    Returns a dict with squad (DataFrame or None if nothing fits), total_rating,
+    total_cost, method used and the number of candidates left after pruning.
+    """
+    if min_bowlers + min_keepers > squad_size:
+        raise ValueError("Minimum bowlers and keepers exceed the squad size")
+    pool = candidates.dropna(subset=[price_col, 'skill_rating'])
+    pool = prune_candidates(pool, squad_size, max_overseas, price_col, home_nation).reset_index(drop=True)
+    role, overseas = _classes(pool, home_nation)
+    rating = pool['skill_rating'].to_numpy(dtype=np.int64)
+    price = pool[price_col].to_numpy(dtype=np.float64)
+    max_overseas = min(max_overseas, squad_size)
+
+    if method == 'auto':
+        states = (squad_size + 1) * (min_bowlers + 1) * (min_keepers + 1) * (max_overseas + 1) * \
+            (int(rating.max(initial=0)) * squad_size + 1)
+        method = 'exact' if len(pool) * states <= EXACT_WORK_LIMIT else 'greedy'
+    args = (rating, price, role, overseas, budget, squad_size, min_bowlers, min_keepers, max_overseas)
+    chosen = None
+    if len(pool) >= squad_size:
+        chosen = _solve_exact(*args) if method == 'exact' else _solve_greedy(*args)
+
+    result = {'squad': None, 'total_rating': 0, 'total_cost': 0.0, 'method': method, 'candidates': len(pool)}
+    if chosen is not None:
+        squad = pool.iloc[chosen].sort_values(['skill_rating', price_col], ascending=[False, True])
+        result.update(squad=squad.reset_index(drop=True), total_rating=int(squad['skill_rating'].sum()),
+                      total_cost=float(squad[price_col].sum()))
+    return result
+
+
+if __name__ == "__main__":
+    import time
+    import database as db
+    start = time.perf_counter()
+    best = optimize_squad(db.fetch_players(), budget=1200)
+    print(best['squad'] if best['squad'] is not None else "No squad fits the purse")
+    print(f"rating {best['total_rating']}, cost ₹{best['total_cost']:.0f} L, {best['method']}, "
+          f"{best['candidates']} candidates, {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,49 @@
+"""
+Seeded synthetic player pools for the benchmarks and tests, shaped like
+players.csv. Needs only numpy and pandas.
+"""
+import numpy as np
+import pandas as pd
+
+ROLES = ["Batsman", "Bowler", "All-rounder", "Wicketkeeper"]
+ROLE_WEIGHTS = [0.25, 0.35, 0.25, 0.15]
+NATIONS = ["India", "Australia", "England", "South Africa", "New Zealand",
+           "West Indies", "Pakistan", "Afghanistan", "Sri Lanka"]
+NATION_WEIGHTS = [0.55, 0.08, 0.08, 0.07, 0.06, 0.06, 0.04, 0.03, 0.03]
+# Mean/sd strike rate by role; bowlers bat rarely and slowly
+STRIKE_RATE = {"Batsman": (135, 15), "Bowler": (60, 30), "All-rounder": (140, 15), "Wicketkeeper": (138, 15)}
+ECONOMY_RATE = {"Bowler": (7.8, 0.6), "All-rounder": (8.3, 0.6)}  # 0.0 for non-bowlers, as in players.csv
+
+
+def generate_players(n, seed=0):
+    """
+    Seeded synthetic players with the players.csv columns. Roles, nationalities,
+    rates and prices follow the shape of the sample data: economy is 0.0 for
+    batsmen and keepers, and base price rises with skill rating in 10-lakh steps
+    between 20 and 200. Names are unique.
+    """
+    rng = np.random.default_rng(seed)
+    role = rng.choice(ROLES, size=n, p=ROLE_WEIGHTS)
+    age = np.clip(np.round(rng.normal(28, 4, n)), 18, 40).astype(int)
+    strike_rate = np.zeros(n)
+    economy_rate = np.zeros(n)
+    for r in ROLES:
+        sel = role == r
+        mean, sd = STRIKE_RATE[r]
+        strike_rate[sel] = np.clip(rng.normal(mean, sd, sel.sum()), 10, 250)
+        if r in ECONOMY_RATE:
+            mean, sd = ECONOMY_RATE[r]
+            economy_rate[sel] = np.clip(rng.normal(mean, sd, sel.sum()), 4, 14)
+    rating = np.clip(np.round(rng.normal(6.5, 1.8, n)), 1, 10).astype(int)
+    price = np.clip(np.round((rating / 10) ** 2 * 20 + rng.normal(0, 2, n)) * 10, 20, 200).astype(int)
+    return pd.DataFrame({
+        'name': [f"Player {i:07d}" for i in range(n)],
+        'nationality': rng.choice(NATIONS, size=n, p=NATION_WEIGHTS),
+        'role': role,
+        'age': age,
+        'matches_played': np.round((age - 17) * rng.uniform(1, 8, n)).astype(int),
+        'strike_rate': np.round(strike_rate, 1),
+        'economy_rate': np.round(economy_rate, 1),
+        'base_price': price,
+        'skill_rating': rating,
+    })
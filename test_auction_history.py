@@ -0,0 +1,104 @@
+import os
+import database as db
+import auction_history
+import bidding
+import pandas as pd
+
+TEST_DB = "test_auction_history.db"
+
+def setup_module():
+    global _previous_db, _previous_interval
+    _previous_db, _previous_interval = db.DB_NAME, db.SNAPSHOT_EVERY
+    db.DB_NAME = TEST_DB
+    db.SNAPSHOT_EVERY = 25  # snapshot often so replays start from one
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(pd.DataFrame({
+        "name": [f"Player {i}" for i in range(60)],
+        "role": ["Batsman", "Bowler", "All-rounder", "Wicketkeeper"] * 15,
+        "base_price": [20 + 5 * (i % 7) for i in range(60)],
+        "skill_rating": [1 + i % 10 for i in range(60)],
+        # A historical outcome arrives with the import
+        "auction_status": ["Sold"] + ["Available"] * 59,
+        "final_price": [90] + [0] * 59,
+    }))
+
+def teardown_module():
+    remove_test_db()
+    db.DB_NAME, db.SNAPSHOT_EVERY = _previous_db, _previous_interval
+
+def remove_test_db():
+    db.close_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+
+def outcomes(df):
+    return df.set_index('id')[['auction_status', 'final_price']].sort_index().astype({'auction_status': str})
+
+def full_replay(event_id):
+    """Reference: the last event per player up to event_id, no snapshots."""
+    with db.get_connection() as conn:
+        events = pd.read_sql_query("SELECT player_id, auction_status, final_price FROM auction_events "
+                                   "WHERE id <= ? ORDER BY id", conn, params=(event_id,))
+    last = events.drop_duplicates('player_id', keep='last').set_index('player_id')
+    state = outcomes(db.fetch_players())
+    state['auction_status'] = last['auction_status'].reindex(state.index).fillna('Available')
+    state['final_price'] = last['final_price'].reindex(state.index).fillna(0).astype('int64')
+    return outcomes(state.reset_index())
+
+def test_rounds_and_point_in_time_state():
+    print("Testing auction history...")
+    db.simulate_auction(seed=1)
+    round_1 = outcomes(db.fetch_players())
+    db.reset_auction()
+    db.simulate_auction(seed=2)
+    quick = int(db.fetch_players({'auction_status': ['Sold']}).iloc[0]['id'])
+    db.reset_auction()
+    bidding.place_bid(quick, "Mumbai", 500)
+    assert bidding.close_bidding(quick) == ('Sold', 500)
+    round_3 = outcomes(db.fetch_players())
+
+    rounds = auction_history.auction_rounds()
+    assert rounds['round'].tolist() == [1, 2, 3]
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM auction_snapshots").fetchone()[0] >= 2
+
+    assert outcomes(auction_history.state_as_of(auction_round=1)).equals(round_1)
+    assert outcomes(auction_history.state_as_of()).equals(round_3)
+    assert outcomes(auction_history.state_as_of(auction_round=3)).equals(round_3)
+    # The opening import event is history too
+    first = auction_history.state_as_of(event_id=1)
+    assert first.loc[first['name'] == "Player 0", 'final_price'].item() == 90
+    assert (first['auction_status'] != 'Available').sum() == 1
+
+    # Snapshot + replay agrees with replaying everything, at every event
+    head = int(rounds['last_event'].max())
+    for event_id in range(0, head + 1, 7):
+        assert outcomes(auction_history.state_as_of(event_id=event_id)).equals(full_replay(event_id))
+    print("✅ State as of any event or round matches a full replay.")
+
+def test_compare_rounds():
+    comparison = auction_history.compare_rounds(1, 2)
+    a = auction_history.state_as_of(auction_round=1)
+    b = auction_history.state_as_of(auction_round=2)
+    roles = comparison['roles'].set_index('role')
+    assert roles['spend_a'].sum() == a.loc[a['auction_status'] == 'Sold', 'final_price'].sum()
+    assert roles['sold_b'].sum() == (b['auction_status'] == 'Sold').sum()
+    assert (roles['spend_change'] == roles['spend_b'] - roles['spend_a']).all()
+
+    moved = comparison['players']
+    changed = (a['auction_status'] != b['auction_status']) | (a['final_price'] != b['final_price'])
+    assert set(moved['id']) == set(a.loc[changed, 'id'])
+    assert moved['price_change'].abs().is_monotonic_decreasing
+    assert auction_history.compare_rounds(2, 2)['players'].empty
+    print("✅ Round comparison totals and movers agree with the states.")
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_rounds_and_point_in_time_state()
+        test_compare_rounds()
+        print("\n🎉 All auction history tests passed!")
+    finally:
+        teardown_module()
@@ -0,0 +1,105 @@
+import os
+import threading
+import database as db
+import bidding
+import pandas as pd
+
+TEST_DB = "test_bidding.db"
+
+def setup_module():
+    global _previous_db
+    _previous_db = db.DB_NAME
+    db.DB_NAME = TEST_DB
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(pd.DataFrame({
+        "name": ["Opener", "Quick", "Spinner", "Keeper"],
+        "role": ["Batsman", "Bowler", "Bowler", "Wicketkeeper"],
+        "base_price": [100, 50, 30, 20],
+        "skill_rating": [9, 7, 6, 5],
+    }))
+
+def teardown_module():
+    remove_test_db()
+    db.DB_NAME = _previous_db
+
+def remove_test_db():
+    db.close_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+
+def player(name):
+    return db.fetch_players({'search': name}).iloc[0]
+
+def test_bid_validation():
+    print("Testing bid validation...")
+    opener = int(player("Opener")['id'])
+    assert bidding.place_bid(opener, "Mumbai", 100)['accepted']
+    rejected = bidding.place_bid(opener, "Chennai", 100)
+    assert not rejected['accepted'] and "current bid" in rejected['reason']
+    assert "base price" in bidding.place_bid(int(player("Quick")['id']), "Chennai", 40)['reason']
+    assert "No player" in bidding.place_bid(9999, "Chennai", 500)['reason']
+    for team, amount in (("", 120), ("Chennai", 0), ("Chennai", 12.5)):
+        try:
+            bidding.place_bid(opener, team, amount)
+            assert False, "invalid bid was accepted"
+        except ValueError:
+            pass
+
+    assert bidding.place_bid(opener, "Chennai", 120)['accepted']
+    leader = player("Opener")
+    assert leader['current_bid'] == 120 and leader['current_team'] == "Chennai"
+    assert list(bidding.bid_history(opener)['amount']) == [120, 100]
+    print("✅ Only Available players, above base and current bid, are accepted.")
+
+def test_concurrent_bids_are_not_lost():
+    quick = int(player("Quick")['id'])
+    accepted = []
+
+    def client(team, amounts):
+        for amount in amounts:
+            if bidding.place_bid(quick, team, amount)['accepted']:
+                accepted.append(amount)
+
+    threads = [threading.Thread(target=client, args=(f"Team {i}", range(50 + i, 450, 8)))
+               for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    history = bidding.bid_history(quick, limit=1000)
+    assert len(history) == len(accepted)
+    assert history['amount'].is_monotonic_decreasing and history['amount'].is_unique
+    assert player("Quick")['current_bid'] == history['amount'].max() == max(accepted)
+    print("✅ Concurrent bids commit in order with no lost updates.")
+
+def test_close_bidding():
+    stats_before = db.get_stats()
+    assert bidding.close_bidding(int(player("Opener")['id'])) == ('Sold', 120)
+    assert bidding.close_bidding(int(player("Keeper")['id'])) == ('Unsold', 0)
+    stats = db.get_stats()
+    assert stats['sold_count'] == stats_before['sold_count'] + 1
+    assert stats['unsold_count'] == stats_before['unsold_count'] + 1
+    assert stats['total_spend'] == stats_before['total_spend'] + 120
+    assert "already Sold" in bidding.place_bid(int(player("Opener")['id']), "Delhi", 500)['reason']
+    try:
+        bidding.close_bidding(int(player("Opener")['id']))
+        assert False, "closed twice"
+    except ValueError:
+        pass
+
+    db.reset_auction()
+    assert (db.fetch_players()['current_bid'] == 0).all()
+    assert len(bidding.bid_history(int(player("Quick")['id']))) > 0  # the log is kept
+    print("✅ Hammer sells to the leading bid and updates the summary.")
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_bid_validation()
+        test_concurrent_bids_are_not_lost()
+        test_close_bidding()
+        print("\n🎉 All bidding tests passed!")
+    finally:
+        teardown_module()
@@ -0,0 +1,173 @@
+import os
+import shutil
+import threading
+import database as db
+import bidding
+import cross_auction
+import jobs
+import pandas as pd
+from synthetic_players import generate_players
+
+TEST_DB = "test_cross_auction.db"
+TEST_AUCTIONS = "test_auctions"
+SEASONS = ['2022', '2023', '2024']
+
+def setup_module():
+    global _previous_db, _previous_dir
+    _previous_db, _previous_dir = db.DB_NAME, db.AUCTIONS_DIR
+    db.DB_NAME, db.AUCTIONS_DIR = TEST_DB, TEST_AUCTIONS
+    remove_test_dbs()
+    db.init_db()
+
+def teardown_module():
+    remove_test_dbs()
+    db.DB_NAME, db.AUCTIONS_DIR = _previous_db, _previous_dir
+
+def remove_test_dbs():
+    db.close_connections()
+    shutil.rmtree(TEST_AUCTIONS, ignore_errors=True)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+
+def load_season(season, seed):
+    # Prices rise each season; seeds differ from generate_players' so outcomes don't track roles
+    players = generate_players(300, seed=1).assign(base_price=lambda d: d['base_price'] + 10 * seed)
+    db.bulk_import(players)
+    db.simulate_auction(seed=100 + seed)
+
+def test_router_isolation():
+    print("Testing auction routing...")
+    errors = []
+
+    def worker(season, seed):
+        try:
+            with db.use_auction(season, create=True):
+                load_season(season, seed)
+                assert db.count_players() == 300
+        except Exception as e:  # surfaced in the main thread
+            errors.append(e)
+
+    # Seasons load side by side without seeing each other's rows
+    threads = [threading.Thread(target=worker, args=(s, i)) for i, s in enumerate(SEASONS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors, errors
+    assert db.list_auctions() == SEASONS
+    assert db.count_players() == 0  # the default database is untouched
+    for i, season in enumerate(SEASONS):
+        with db.use_auction(season):
+            assert db.database_name() == db.auction_path(season)
+            assert db.fetch_players()['base_price'].min() >= 20 + 10 * i
+    assert db.database_name() == TEST_DB
+    print("✅ Each auction reads and writes its own file.")
+
+    for bad in ('../escape', 'a/b', '', None):
+        try:
+            db.auction_path(bad)
+            assert False, f"accepted {bad!r}"
+        except ValueError:
+            pass
+    try:
+        with db.use_auction('1999'):
+            assert False, "opened a missing auction"
+    except ValueError:
+        pass
+    assert not os.path.exists(db.auction_path('1999'))
+
+    # Background jobs run against the auction they were submitted from
+    with db.use_auction('2025', create=True):
+        job = jobs.wait(jobs.submit_import(generate_players(50, seed=2)), timeout=30)
+        assert job['status'] == 'done' and db.count_players() == 50
+    assert db.count_players() == 0
+    print("✅ Ids are validated; jobs follow the submitting thread's auction.")
+
+def test_archive():
+    print("Testing season archive...")
+    db.bulk_import(generate_players(40, seed=5))
+    db.simulate_auction(seed=6)
+    db.archive_auction('live-copy')
+    with db.use_auction('live-copy'):
+        archived = db.fetch_players()
+    assert archived.equals(db.fetch_players())
+    try:
+        db.archive_auction('live-copy')
+        assert False, "overwrote an archive"
+    except ValueError:
+        pass
+    print("✅ Archived auctions are exact copies and never overwritten.")
+
+def test_bids_follow_auction():
+    print("Testing bid routing...")
+    errors = []
+
+    def bidder(auction):
+        try:
+            with db.use_auction(auction, create=True):
+                db.bulk_import(generate_players(10, seed=7))
+                for player_id in db.fetch_players()['id']:
+                    assert bidding.place_bid(player_id, auction, 200)['accepted']
+                assert db.fetch_players()['current_team'].eq(auction).all()
+        except Exception as e:  # surfaced in the main thread
+            errors.append(e)
+
+    # Bids from both auctions share the writer thread, often in the same batch
+    threads = [threading.Thread(target=bidder, args=(auction,)) for auction in ('bids-a', 'bids-b')]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors, errors
+    for auction in ('bids-a', 'bids-b'):
+        with db.use_auction(auction):
+            assert len(bidding.bid_history(1)) == 1
+    assert bidding.bid_history(1).empty  # nothing landed in the default database
+    print("✅ Queued bids commit to the bidder's auction.")
+
+def test_cross_auction_analytics():
+    print("Testing cross-auction analytics...")
+    frames = []
+    for season in SEASONS:
+        with db.use_auction(season):
+            frames.append(db.fetch_players().assign(auction=season))
+    everything = pd.concat(frames)
+    sold = everything[everything['auction_status'] == 'Sold']
+
+    for workers in (1, 2):
+        prices = cross_auction.role_prices(SEASONS, workers=workers)
+        overall = prices['overall'].set_index('role')
+        expected = sold.groupby('role')['final_price'].mean().round(1)
+        assert (overall['avg_price'] == expected.loc[overall.index]).all()
+        assert (overall['players'] == everything.groupby('role').size().loc[overall.index]).all()
+        by_auction = prices['by_auction'].set_index(['auction', 'role'])
+        expected = sold.groupby(['auction', 'role'])['final_price'].sum()
+        assert (by_auction['total_spend'].loc[expected.index] == expected).all()
+    print("✅ Merged partial aggregates match a pooled scan, in-process and in a process pool.")
+
+    names = ['Player 0000001', 'Player 0000007', 'Nobody']
+    trajectories = cross_auction.price_trajectories(names, SEASONS, workers=2)
+    assert len(trajectories) == 6 and set(trajectories['name']) == set(names[:2])
+    first = trajectories[trajectories['name'] == names[0]]
+    assert list(first['auction']) == SEASONS
+    expected = everything[everything['name'] == names[0]].set_index('auction')['final_price']
+    assert list(first['final_price']) == list(expected.loc[SEASONS])
+    assert cross_auction.price_trajectories([], SEASONS).empty
+    try:
+        cross_auction.role_prices(['1999'])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✅ Price trajectories follow each player across seasons.")
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_router_isolation()
+        test_archive()
+        test_bids_follow_auction()
+        test_cross_auction_analytics()
+        print("\n🎉 All cross-auction tests passed!")
+    finally:
+        teardown_module()
@@ -0,0 +1,145 @@
+import io
+import os
+import sqlite3
+import threading
+import time
+import database as db
+import jobs
+import pandas as pd
+
+TEST_DB = "test_jobs.db"
+
+def setup_module():
+    global _previous_db
+    _previous_db = db.DB_NAME
+    db.DB_NAME = TEST_DB
+    remove_test_db()
+    db.init_db()
+
+def teardown_module():
+    remove_test_db()
+    db.DB_NAME = _previous_db
+
+def remove_test_db():
+    db.close_connections()
+    for suffix in ("", "-wal", "-shm", jobs.JOBS_SUFFIX, jobs.JOBS_SUFFIX + "-journal"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+
+def test_import_and_simulation_jobs():
+    print("Testing background import and simulation...")
+    csv = pd.DataFrame({
+        "name": [f"P{i}" for i in range(500)],
+        "role": ["Bowler", "Batsman"] * 250,
+        "base_price": [20 + i % 100 for i in range(500)],
+        "skill_rating": [1 + i % 10 for i in range(500)],
+    }).to_csv(index=False).encode()
+    job = jobs.wait(jobs.submit_import(io.BytesIO(csv)), timeout=30)
+    assert job['status'] == 'done' and job['result'] == {'rows': 500}
+    assert job['progress'] == 1.0 and job['finished_at'] >= job['started_at']
+    assert db.count_players() == 500
+
+    job = jobs.wait(jobs.submit_simulation(seed=3), timeout=30)
+    assert job['status'] == 'done' and job['result'] == {'players': 500}
+    assert db.count_players({'auction_status': ['Available']}) == 0
+    assert not jobs.cancel(job['id'])  # already finished
+    print("✅ Jobs run to completion and record their results.")
+
+def test_simulation_progress():
+    db.reset_auction()
+    job, seen = jobs.Job(None, 'simulate_auction'), []
+    job.report = lambda fraction, message=None: seen.append(fraction)
+    assert jobs._simulate_task(job, seed=4) == {'players': 500}
+    assert seen == [0.0] + [fraction for fraction, _ in jobs.SIMULATE_STAGES.values()]
+    print("✅ Simulation reports progress per stage.")
+
+def test_failed_and_cancelled_jobs():
+    job = jobs.wait(jobs.submit('broken', lambda job: 1 / 0), timeout=30)
+    assert job['status'] == 'failed' and 'division by zero' in job['error']
+
+    # A long statement is interrupted as soon as the job is cancelled
+    started = threading.Event()
+
+    def long_query(job):
+        started.set()
+        with db.get_connection() as conn:
+            conn.execute('''
+                WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+                SELECT MAX(i) FROM n
+            ''').fetchone()
+
+    job_id = jobs.submit('endless', long_query)
+    queued = jobs.submit_simulation()  # waits behind the endless job
+    started.wait(10)
+    assert jobs.get_job(queued)['status'] == 'queued'
+    assert jobs.cancel(queued) and jobs.cancel(job_id)
+    assert jobs.wait(job_id, timeout=30)['status'] == 'cancelled'
+    assert jobs.wait(queued, timeout=30)['status'] == 'cancelled'
+    assert jobs.get_job(queued)['started_at'] is None
+    assert list(jobs.list_jobs()['id'][:2]) == [queued, job_id]
+    print("✅ Failures are recorded and cancellation interrupts running SQL.")
+
+def test_submit_while_locked():
+    print("Testing submission while another write holds the lock...")
+    def answer(job):
+        with db.transaction():  # waits for the holder's write
+            return 42
+
+    holder = sqlite3.connect(TEST_DB, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        job_id = jobs.submit('answer', answer)
+        assert time.perf_counter() - started < 1
+        assert jobs.get_job(job_id)['status'] in ('queued', 'running')
+        assert jobs.list_jobs()['id'][0] == job_id
+    finally:
+        holder.rollback()
+        holder.close()
+    job = jobs.wait(job_id, timeout=30)
+    assert job['status'] == 'done' and job['result'] == 42
+    print("✅ Submitting never waits on the write lock.")
+
+def test_ids_from_sqlite():
+    # Another process submitting at the same time gets its own row, never ours
+    other = sqlite3.connect(TEST_DB + jobs.JOBS_SUFFIX)
+    with other:
+        other_id = other.execute("INSERT INTO jobs (kind, created_at) VALUES ('elsewhere', ?)",
+                                 (time.time(),)).lastrowid
+    other.close()
+    job_id = jobs.submit('answer', lambda job: 42)
+    assert job_id > other_id
+    assert jobs.wait(job_id, timeout=30)['result'] == 42
+    elsewhere = jobs.get_job(other_id)
+    assert elsewhere['kind'] == 'elsewhere' and elsewhere['status'] == 'queued'
+    print("✅ Job ids are assigned by SQLite.")
+
+def test_final_write_failure():
+    record = jobs._record
+
+    def failing_record(db_name, job, **fields):
+        if 'finished_at' in fields:
+            raise sqlite3.OperationalError("database is locked")
+        record(db_name, job, **fields)
+
+    jobs._record = failing_record
+    try:
+        job_id = jobs.submit('answer', lambda job: 42)
+        assert jobs.wait(job_id, timeout=30) is not None
+    finally:
+        jobs._record = record
+    assert not any(key[1] == job_id for key in jobs._active)
+    print("✅ A failed final write still releases the job.")
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_import_and_simulation_jobs()
+        test_simulation_progress()
+        test_failed_and_cancelled_jobs()
+        test_submit_while_locked()
+        test_ids_from_sqlite()
+        test_final_write_failure()
+        print("\n🎉 All job tests passed!")
+    finally:
+        teardown_module()
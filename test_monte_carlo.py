@@ -0,0 +1,67 @@
+import os
+import database as db
+import monte_carlo as mc
+import pandas as pd
+
+TEST_DB = "test_monte_carlo.db"
+
+def setup_module():
+    global _previous_db
+    _previous_db = db.DB_NAME
+    db.DB_NAME = TEST_DB
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(pd.DataFrame({
+        "name": ["Star", "Journeyman", "Rookie"],
+        "role": ["Batsman", "Bowler", "Bowler"],
+        "base_price": [200, 50, 20],
+        "skill_rating": [10, 6, 2],
+    }))
+
+def teardown_module():
+    remove_test_db()
+    db.DB_NAME = _previous_db
+
+def remove_test_db():
+    db.close_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+
+def test_forecast():
+    print("Testing Monte Carlo forecast...")
+    before = db.fetch_players()
+    forecast = mc.run_monte_carlo(iterations=4000, seed=3, workers=2)
+    players = forecast['players'].set_index('name')
+
+    # Sell chance follows the 0.3 / 0.6 thresholds
+    assert abs(players.loc['Star', 'sell_probability'] - 0.7) < 0.03
+    assert abs(players.loc['Rookie', 'sell_probability'] - 0.4) < 0.03
+
+    # Sold prices stay within the multiplier range and percentiles are ordered
+    star = players.loc['Star']
+    assert 400 <= star['p10_price'] <= star['p50_price'] <= star['p90_price'] <= 1000
+    assert 400 <= star['mean_price'] <= 1000
+    print("✅ Forecast matches the auction rule.")
+
+    # Reproducible for the same seed and worker count
+    again = mc.run_monte_carlo(iterations=4000, seed=3, workers=2)
+    assert again['players'].equals(forecast['players'])
+    assert again['role_spend'].equals(forecast['role_spend'])
+
+    # Expected spend per role agrees with the per-player expectations
+    spend = forecast['role_spend'].set_index('role')['expected_spend']
+    expected = players['sell_probability'] * players['mean_price']
+    assert abs(spend['Bowler'] - expected[['Journeyman', 'Rookie']].sum()) < 1e-6
+
+    # Nothing was written
+    assert db.fetch_players().equals(before)
+    print("✅ Forecast is reproducible and read-only.")
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_forecast()
+        print("\n🎉 All Monte Carlo tests passed!")
+    finally:
+        teardown_module()
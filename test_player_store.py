@@ -0,0 +1,72 @@
+import os
+import database as db
+import player_store
+import pandas as pd
+
+TEST_DB = "test_player_store.db"
+
+def setup_module():
+    global _previous_db
+    _previous_db = db.DB_NAME
+    db.DB_NAME = TEST_DB
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(pd.DataFrame({
+        "name": [f"{first} {i}" for i, first in enumerate(["Virat", "Steve", "Joe", "Kane"] * 30)],
+        "nationality": ["India", "Australia", "England", "New Zealand", "India"] * 24,
+        "role": ["Batsman", "Bowler", "All-rounder"] * 40,
+        "base_price": [20 + 10 * (i % 19) for i in range(120)],
+        "skill_rating": [1 + i % 10 for i in range(120)],
+        "strike_rate": [100.0 + i * 0.7 for i in range(120)],
+    }))
+
+def teardown_module():
+    remove_test_db()
+    db.DB_NAME = _previous_db
+
+def remove_test_db():
+    db.close_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+
+def test_snapshot_matches_database():
+    print("Testing columnar snapshot...")
+    snapshot = player_store.get_snapshot()
+    assert str(snapshot.frame['role'].dtype) == 'category'
+    assert snapshot.frame['skill_rating'].dtype.itemsize == 1
+    assert snapshot.frame['base_price'].dtype.itemsize == 2
+
+    filter_mixes = [
+        None,
+        {'role': ['Bowler', 'Batsman'], 'price_min': 50, 'price_max': 150},
+        {'nationality': ['India'], 'rating_min': 5},
+        {'search': 'STEVE 1', 'role': ['Bowler', 'Wicketkeeper']},
+        {'nationality': ['Nowhere']},
+    ]
+    for filters in filter_mixes:
+        assert player_store.count_players(filters) == db.count_players(filters)
+        for sort_by in db.SORT_COLUMNS:
+            expected, _ = db.fetch_players_page(filters, sort_by, True, page_size=1000)
+            got, cursor = player_store.fetch_players_page(filters, sort_by, True, page_size=1000)
+            assert cursor is None
+            pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+    print("✅ Snapshot filters and sorts like SQLite.")
+
+def test_snapshot_refreshes_on_write():
+    first = player_store.get_snapshot()
+    assert player_store.get_snapshot() is first
+    db.simulate_auction(seed=1)
+    second = player_store.get_snapshot()
+    assert second is not first
+    assert player_store.count_players({'auction_status': ['Available']}) == 0
+    print("✅ Snapshot rebuilds after a write.")
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_snapshot_matches_database()
+        test_snapshot_refreshes_on_write()
+        print("\n🎉 All player store tests passed!")
+    finally:
+        teardown_module()
@@ -0,0 +1,109 @@
+import os
+import numpy as np
+import pandas as pd
+import database as db
+import pricing
+from synthetic_players import generate_players
+
+TEST_DB = "test_pricing.db"
+
+def setup_module():
+    global _previous_db
+    _previous_db = db.DB_NAME
+    db.DB_NAME = TEST_DB
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(generate_players(2000, seed=3))
+
+def teardown_module():
+    remove_test_db()
+    db.DB_NAME = _previous_db
+
+def remove_test_db():
+    db.close_connections()
+    pricing._models.clear()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+
+def reference_fit(sales, players):
+    """Reference: ordinary least squares on the full design matrix of every sale, then predict players."""
+    frame = pd.concat([sales, players], keys=['sales', 'players'])
+    x = pd.get_dummies(frame[pricing.CATEGORICAL].astype(str), drop_first=True).astype(float)
+    x = pd.concat([frame[pricing.NUMERIC].fillna(0), x], axis=1).assign(intercept=1.0).to_numpy(dtype=float)
+    coefficients = np.linalg.lstsq(x[:len(sales)], sales['final_price'].to_numpy(dtype=float), rcond=None)[0]
+    return x[len(sales):] @ coefficients
+
+def sold():
+    return db.fetch_players({'auction_status': ['Sold']})
+
+def test_not_ready():
+    print("Testing the untrained model...")
+    model = pricing.get_model()
+    assert model.sales == 0 and not model.ready
+    priced = pricing.with_fair_value(db.fetch_players_page()[0])
+    assert priced['predicted_price'].isna().all() and priced['value_gap'].isna().all()
+    print("✅ No sales, no prices.")
+
+def test_matches_least_squares():
+    print("Testing the fit...")
+    db.simulate_auction(seed=4)
+    players = db.fetch_players()
+    model = pricing.get_model()
+    assert model.sales == len(sold()) and model.ready
+    assert np.allclose(model.predict(players), reference_fit(sold(), players), atol=1e-6)
+    assert 0 < model.r_squared() < 1
+    print("✅ Coefficients match ordinary least squares over the sales.")
+
+def test_incremental_refit():
+    print("Testing incremental refits...")
+    first_round = sold()
+    model = pricing.get_model()
+    db.reset_auction()
+    db.simulate_auction(seed=5)
+    assert pricing.get_model() is model  # caught up, not rebuilt
+    sales = pd.concat([first_round, sold()], ignore_index=True)
+    assert model.sales == len(sales)
+    players = db.fetch_players()
+    assert np.allclose(model.predict(players), reference_fit(sales, players), atol=1e-6)
+
+    pricing._models.clear()
+    assert np.allclose(pricing.get_model().predict(players), model.predict(players), atol=1e-6)
+    print("✅ New sales are folded in and match a refit from scratch.")
+
+    # Rewriting stats in place, or a sale from a new nationality, starts over
+    model = pricing.get_model()
+    clone = players.iloc[0].to_dict()
+    db.upsert_players([{**clone, 'matches_played': clone['matches_played'] + 40}])
+    assert pricing.get_model() is not model
+    db.bulk_import(pd.DataFrame([{**clone, 'name': 'Newcomer', 'nationality': 'Netherlands',
+                                  'auction_status': 'Sold', 'final_price': 300}]))
+    model = pricing.get_model()
+    assert 'nationality=Netherlands' in model.columns and model.sales == len(sales) + 1
+    print("✅ Upserted stats and unseen categories trigger a full refit.")
+
+def test_scoring():
+    print("Testing scoring...")
+    page, _ = db.fetch_players_page(page_size=100)
+    priced = pricing.with_fair_value(page)
+    model = pricing.get_model()
+    assert np.allclose(priced['predicted_price'], model.predict(page), atol=0.05)
+    asking = np.where(page['auction_status'] == 'Sold', page['final_price'], page['base_price'])
+    assert np.allclose(priced['value_gap'], asking - priced['predicted_price'], atol=0.11)
+
+    scored = pricing.score_available({'role': ['Bowler']})
+    assert len(scored) == db.count_players({'role': ['Bowler'], 'auction_status': ['Available']})
+    assert scored['value_gap'].is_monotonic_increasing and (scored['role'] == 'Bowler').all()
+    assert np.allclose(scored['predicted_price'], model.predict(scored), atol=0.05)
+    print("✅ Pages and every Available player are scored against the model.")
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_not_ready()
+        test_matches_least_squares()
+        test_incremental_refit()
+        test_scoring()
+        print("\n🎉 All pricing tests passed!")
+    finally:
+        teardown_module()
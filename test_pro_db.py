@@ -1,4 +1,6 @@
+import json
 import os
+import sqlite3
 import database as db
 import pandas as pd
 
@@ -6,12 +8,18 @@ import pandas as pd
 TEST_DB = "test_pro_scout.db"
 db.DB_NAME = TEST_DB
 
+def remove_test_db():
+    """Closes pooled connections and removes the db with its WAL files."""
+    db.close_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+
 def test_database_logic():
     print("Testing Professional Database Logic...")
     
     # 1. Init
-    if os.path.exists(TEST_DB):
-        os.remove(TEST_DB)
+    remove_test_db()
     db.init_db()
     print("✅ Database initialized.")
 
@@ -62,12 +70,757 @@ def test_database_logic():
     print("✅ Auction Simulation executed (Status updated).")
     
     # Cleanup
-    if os.path.exists(TEST_DB):
-        os.remove(TEST_DB)
+    remove_test_db()
+
+def test_connection_pool():
+    print("Testing Connection Pool...")
+    remove_test_db()
+    db.init_db()
+
+    # Same thread reuses one connection, in WAL mode
+    with db.get_connection() as c1, db.get_connection() as c2:
+        assert c1 is c2
+        assert c1.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    # Other threads get their own connection
+    import threading
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(db._thread_connection()))
+    t.start()
+    t.join()
+    assert seen[0] is not c1
+    print("✅ One connection per thread, WAL enabled.")
+
+    # Failed transactions roll back
+    try:
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO players (name, role, base_price, skill_rating) VALUES ('X', 'Bowler', 20, 5)")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert len(db.fetch_players()) == 0
+    print("✅ Transaction rollback works.")
+
+    # A replaced database file is picked up on next use
+    remove_test_db()
+    db.init_db()
+    db.add_player({
+        "name": "Fresh", "nationality": "India", "role": "Bowler", "age": 20,
+        "matches_played": 1, "strike_rate": 0.0, "economy_rate": 7.0,
+        "base_price": 20, "skill_rating": 5
+    })
+    assert len(db.fetch_players()) == 1
+    print("✅ Pool reconnects after the file is replaced.")
+
+    remove_test_db()
+
+def test_result_cache():
+    print("Testing Result Cache...")
+    remove_test_db()
+    db.init_db()
+    db.clear_cache()
+    player = {
+        "name": "Cached", "nationality": "India", "role": "Bowler", "age": 22,
+        "matches_played": 5, "strike_rate": 90.0, "economy_rate": 7.0,
+        "base_price": 40, "skill_rating": 6
+    }
+    db.add_player(player)
+
+    # Same filters in a different order hit the cache
+    first = db.fetch_players({'role': ['Bowler', 'Batsman'], 'search': ''})
+    second = db.fetch_players({'role': ['Batsman', 'Bowler']})
+    assert len(first) == len(second) == 1
+    assert db.cache_info()['hits'] == 1
+    print("✅ Normalized filters hit the cache.")
+
+    # Mutating a returned frame doesn't leak into the cache
+    second.loc[0, 'name'] = "Changed"
+    assert db.fetch_players({'role': ['Bowler']}).iloc[0]['name'] == "Cached"
+
+    # A write from another process invalidates it
+    import subprocess, sys
+    code = (f"import database as db; db.DB_NAME = {TEST_DB!r}; "
+            f"db.add_player({{**{player!r}, 'name': 'Other Process'}})")
+    subprocess.run([sys.executable, "-c", code], check=True)
+    assert len(db.fetch_players({'role': ['Bowler']})) == 2
+    assert db.get_stats()['total_players'] == 2
+    print("✅ Cross-process writes invalidate cached results.")
+
+    # LRU eviction is bounded
+    for price in range(db.CACHE_SIZE + 5):
+        db.fetch_players({'price_min': price})
+    info = db.cache_info()
+    assert info['size'] == db.CACHE_SIZE and info['evictions'] > 0
+    print("✅ Cache stays bounded.")
+    remove_test_db()
+
+def test_summary_stats():
+    print("Testing Summary Stats...")
+    remove_test_db()
+    db.init_db()
+    db.add_player({
+        "name": "Solo", "nationality": "India", "role": "Batsman", "age": 30,
+        "matches_played": 50, "strike_rate": 130.0, "economy_rate": 0.0,
+        "base_price": 100, "skill_rating": 8
+    })
+    db.bulk_import(pd.DataFrame({
+        "name": ["B1", "B2", "K1"],
+        "role": ["Bowler", "Bowler", "Wicketkeeper"],
+        "base_price": [20, 40, 60],
+        "skill_rating": [4, 9, 6],
+    }))
+
+    def from_scan():
+        players = db.fetch_players()
+        sold = players[players['auction_status'] == 'Sold']
+        return {
+            'total_players': len(players), 'avg_price': players['base_price'].mean(),
+            'max_rating': players['skill_rating'].max(),
+            'role_dist': players.groupby('role').size().to_dict(),
+            'sold_count': len(sold), 'total_spend': sold['final_price'].sum(),
+        }
+
+    def check():
+        stats = db.get_stats()
+        expected = from_scan()
+        assert stats['total_players'] == expected['total_players']
+        assert abs(stats['avg_price'] - expected['avg_price']) < 1e-9
+        assert stats['max_rating'] == expected['max_rating']
+        assert dict(zip(stats['role_dist']['role'], stats['role_dist']['count'])) == expected['role_dist']
+        assert stats['sold_count'] == expected['sold_count']
+        assert stats['total_spend'] == expected['total_spend']
+
+    check()
+    db.simulate_auction()
+    check()
+    stats = db.get_stats()
+    assert stats['sold_count'] + stats['unsold_count'] == 4
+    db.reset_auction()
+    check()
+    print("✅ Summary table matches a full scan after every write.")
+    remove_test_db()
+
+def test_streaming_import():
+    print("Testing Streaming Import...")
+    remove_test_db()
+    db.init_db()
+    import io
+    csv = io.StringIO(
+        "name,role,base_price,skill_rating,nationality,extra\n"
+        + "".join(f"Streamed {i},Bowler,{20 + i},{1 + i % 10},,ignored\n" for i in range(25))
+    )
+    seen = []
+    assert db.bulk_import(csv, chunksize=10, progress=seen.append) == 25
+    assert seen == [10, 20, 25]
+    players = db.fetch_players()
+    assert len(players) == 25
+    assert (players['nationality'] == 'Unknown').all()
+    assert len(db.fetch_players({'search': 'Streamed 1'})) == 11  # 1, 10-19
+    print("✅ CSV streams in chunks with progress and defaults.")
+
+    # Single inserts are still indexed for search after a bulk import
+    db.add_player({
+        "name": "After Import", "nationality": "India", "role": "Batsman", "age": 25,
+        "matches_played": 1, "strike_rate": 120.0, "economy_rate": 0.0,
+        "base_price": 20, "skill_rating": 5
+    })
+    assert len(db.fetch_players({'search': 'After Imp'})) == 1
+
+    # Bad values reject the whole import and leave the input untouched
+    bad = pd.DataFrame({"name": ["Ok", "Bad"], "role": ["Bowler", "Bowler"],
+                        "base_price": [20, "lots"], "skill_rating": [5, 6]})
+    try:
+        db.bulk_import(bad, chunksize=1)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert list(bad.columns) == ["name", "role", "base_price", "skill_rating"]
+    assert len(db.fetch_players()) == 26
+    assert db.get_stats()['total_players'] == 26
+    print("✅ Invalid rows roll back the import.")
+    remove_test_db()
+
+def test_vectorized_simulation():
+    print("Testing Vectorized Simulation...")
+    import numpy as np
+
+    # Same draws through the original per-player rule give identical outcomes
+    base = np.array([20, 35, 50, 150, 200, 75] * 50)
+    rating = np.array([1, 5, 7, 8, 10, 3] * 50)
+    sold, price = db._auction_outcomes(base, rating, np.random.default_rng(7))
+    rng = np.random.default_rng(7)
+    luck, spread = rng.random(len(base)), rng.uniform(1, 4, len(base))
+    for i in range(len(base)):
+        threshold = 0.3 if rating[i] > 7 else 0.6
+        expected_sold = luck[i] > threshold
+        expected_price = 5 * round(int(base[i] * (1 + (rating[i] / 10) * spread[i])) / 5) if expected_sold else 0
+        assert sold[i] == expected_sold and price[i] == expected_price
+    print("✅ Vectorized rule matches the per-player rule.")
+
+    # Seeded runs are reproducible and write through to players and stats
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(pd.DataFrame({
+        "name": [f"S{i}" for i in range(40)], "role": ["Bowler", "Batsman"] * 20,
+        "base_price": [20 + 5 * i for i in range(40)], "skill_rating": [1 + i % 10 for i in range(40)],
+    }))
+    outcomes = []
+    for _ in range(2):
+        db.reset_auction()
+        assert db.simulate_auction(seed=42) == 40
+        outcomes.append(db.fetch_players()[['auction_status', 'final_price']])
+    assert outcomes[0].equals(outcomes[1])
+    assert db.simulate_auction(seed=42) == 0  # nothing left Available
+    sold = outcomes[0][outcomes[0]['auction_status'] == 'Sold']
+    stats = db.get_stats()
+    assert stats['sold_count'] == len(sold) and stats['total_spend'] == sold['final_price'].sum()
+    print("✅ Seeded simulation is reproducible.")
+    remove_test_db()
+
+def test_keyset_pagination():
+    print("Testing Keyset Pagination...")
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(pd.DataFrame({
+        "name": [f"P{i:03d}" for i in range(57)],
+        "role": ["Bowler", "Batsman", "All-rounder"] * 19,
+        "base_price": [20 + 10 * (i % 5) for i in range(57)],  # many ties
+        "skill_rating": [1 + i % 10 for i in range(57)],
+    }))
+    filters = {'role': ['Bowler', 'Batsman']}
+    assert db.count_players(filters) == 38
+
+    expected = db.fetch_players(filters)
+    for sort_by in db.SORT_COLUMNS:
+        for descending in (False, True):
+            pages, cursor = [], None
+            while True:
+                page, cursor = db.fetch_players_page(filters, sort_by, descending, page_size=10, cursor=cursor)
+                pages.append(page)
+                if cursor is None:
+                    break
+            ids = list(pd.concat(pages)['id'])
+            order = expected.sort_values([sort_by, 'id'], ascending=not descending)
+            assert ids == list(order['id']), (sort_by, descending)
+            assert [len(p) for p in pages] == [10, 10, 10, 8]
+    print("✅ Pages cover every row once, in order, for every sort key.")
+
+    try:
+        db.fetch_players_page(sort_by="age; DROP TABLE players")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    remove_test_db()
+
+def test_chart_aggregates():
+    print("Testing Chart Aggregates...")
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(pd.DataFrame({
+        "name": [f"C{i}" for i in range(300)],
+        "role": ["Bowler", "Batsman", "Wicketkeeper"] * 100,
+        "base_price": [20 + i % 181 for i in range(300)],
+        "skill_rating": [1 + i % 10 for i in range(300)],
+    }))
+    players = db.fetch_players()
+
+    bins = db.price_rating_bins(price_bin_size=50)
+    assert bins['count'].sum() == 300
+    expected = players.assign(price_bucket=players['base_price'] // 50 * 50) \
+        .groupby(['role', 'skill_rating', 'price_bucket']).size()
+    assert len(bins) == len(expected)
+    print("✅ Binned counts cover every player.")
+
+    sample = db.sample_players(size=40, seed=1)
+    assert len(sample) == 40
+    assert sample.equals(db.sample_players(size=40, seed=1))
+    assert len(db.sample_players(size=1000)) == 300  # fewer rows than the cap
+    names = db.sample_players(size=40, seed=1, columns=('name',))['name']
+    assert names.is_unique and names.isin(players['name']).all()
+
+    # Every row is equally likely to be picked
+    import random
+    hits = [0] * 100
+    for trial in range(2000):
+        for i in db._reservoir_sample(range(100), 10, random.Random(trial)):
+            hits[i] += 1
+    assert min(hits) > 140 and max(hits) < 260  # expected 200 each
+    print("✅ Reservoir sample is bounded, stable and uniform.")
+    remove_test_db()
+
+def test_indexed_filters_at_scale():
+    print("Testing index usage at 1M rows...")
+    remove_test_db()
+    db.init_db()
+    with db.transaction() as conn:
+        conn.execute('''
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < 1000000)
+            INSERT INTO players (name, nationality, role, age, base_price, skill_rating)
+            SELECT 'Player ' || n,
+                   CASE n % 3 WHEN 0 THEN 'India' WHEN 1 THEN 'Australia' ELSE 'England' END,
+                   CASE n % 4 WHEN 0 THEN 'Batsman' WHEN 1 THEN 'Bowler' WHEN 2 THEN 'All-rounder' ELSE 'Wicketkeeper' END,
+                   18 + n % 20, 20 + (n % 19) * 10, 1 + n % 10
+            FROM seq
+        ''')
+        conn.execute("ANALYZE")
+
+    filter_mixes = [
+        {'search': 'yer 12345'},
+        {'role': ['Bowler'], 'price_min': 20, 'price_max': 200},
+        {'nationality': ['India', 'England'], 'price_min': 50, 'price_max': 100},
+        {'search': 'Player 99', 'role': ['Batsman', 'Bowler'], 'price_min': 20, 'price_max': 200},
+        {'price_min': 150, 'price_max': 160},
+        {'rating_min': 10},
+        {'value_score_min': 4},
+        {'role': ['Bowler'], 'economy_rate_pct_min': 0.95},
+    ]
+    with db.get_connection() as conn:
+        for filters in filter_mixes:
+            query, params = db._players_query(conn, filters)
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+            full_scans = [step for step in plan if step == "SCAN players" or step.startswith("SCAN players USING")]
+            assert not full_scans, f"{filters} -> {plan}"
+
+    assert len(db.fetch_players({'search': 'yer 123456'})) == 1
+    print("✅ Every filter mix is served by an index.")
+    remove_test_db()
+
+def test_profiling():
+    print("Testing Query Profiling...")
+    remove_test_db()
+    db.clear_profile()
+    db.init_db()
+    db.fetch_players()
+    assert db.profile_records() == []  # off by default
+    print("✅ Nothing recorded while profiling is off.")
+
+    db.enable_profiling()
+    try:
+        db.bulk_import(pd.DataFrame({"name": [f"P{i}" for i in range(30)], "role": ["Bowler"] * 30,
+                                    "base_price": [50] * 30, "skill_rating": [5] * 30}))
+        db.fetch_players({'role': ['Bowler']})
+        with db.profile_section("tab:test"):
+            db.count_players()
+    finally:
+        db.enable_profiling(False)
+
+    records = {r['operation']: r for r in db.profile_records()}
+    assert records['fetch_players']['rows'] == 30
+    assert any('FROM players' in sql for sql in records['fetch_players']['sql'])
+    assert records['tab:test']['kind'] == 'section'
+    assert records['bulk_import']['statements'] >= 30 >= len(records['bulk_import']['sql'])
+    summary = db.profile_summary()
+    assert set(summary['operation']) == set(records)
+    assert (summary['p95_ms'] >= summary['p50_ms']).all()
+    exported = json.loads(db.export_profile_json())
+    assert len(exported['records']) == len(db.profile_records()) == 4
+    print("✅ Calls, SQL text, sections and JSON export recorded.")
+    db.clear_profile()
+
+    # Reads served by the replica are traced on the replica's connection
+    db.enable_profiling()
+    db.enable_replica()
+    try:
+        db.fetch_players({'role': ['Batsman']})  # not cached yet
+    finally:
+        db.enable_replica(False)
+        db.enable_profiling(False)
+    record = db.profile_records()[-1]
+    assert record['operation'] == 'fetch_players' and record['statements'] > 0
+    assert any('FROM players' in sql for sql in record['sql'])
+    print("✅ Replica reads are profiled too.")
+    db.clear_profile()
+    remove_test_db()
+
+def test_schema_migrations():
+    print("Testing Schema Migrations...")
+    remove_test_db()
+    assert db.init_db() == db.SCHEMA_VERSION
+    assert db.schema_version() == db.SCHEMA_VERSION
+    db.add_player({
+        "name": "Keeper", "nationality": "India", "role": "Wicketkeeper", "age": 30,
+        "matches_played": 50, "strike_rate": 130.0, "economy_rate": 0.0,
+        "base_price": 100, "skill_rating": 8
+    })
+    assert db.init_db() == 0  # already current: nothing rebuilt
+    assert len(db.fetch_players()) == 1
+    print("✅ Startup on a current schema keeps the data.")
+
+    # A database from before versioning is adopted without losing rows
+    with db.get_connection() as conn:
+        conn.execute("PRAGMA user_version = 0")
+        conn.execute("DROP TABLE player_stats")
+    assert db.init_db() == db.SCHEMA_VERSION
+    assert db.get_stats()['total_players'] == 1
+    assert len(db.fetch_players({'search': 'Keep'})) == 1
+    print("✅ Unversioned database migrated in place.")
+
+    assert db.warm_start("players.csv") == 0  # not empty
+    remove_test_db()
+    db.init_db()
+    loaded = db.warm_start("players.csv")
+    assert loaded == len(pd.read_csv("players.csv")) == len(db.fetch_players())
+    assert db.warm_start("players.csv") == 0
+    assert db.warm_start("missing.csv") == 0
+    holder = sqlite3.connect(TEST_DB, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")  # a long write in another session
+    try:
+        assert db.warm_start("players.csv") == 0  # answered without the write lock
+    finally:
+        holder.rollback()
+        holder.close()
+    print("✅ Warm start seeds an empty database once.")
+    remove_test_db()
+
+def role_percentiles(players):
+    """Reference percent ranks by brute force: share of role-mates strictly below each player."""
+    out = {}
+    for pid, row in players.set_index('id').iterrows():
+        mates = players[players['role'] == row['role']]
+        bowlers = mates[mates['economy_rate'] > 0]
+        def share(below, size):
+            return round(below / (size - 1), 4) if size > 1 else 0.0
+        skill = share((mates['skill_rating'] < row['skill_rating']).sum(), len(mates))
+        out[pid] = {
+            'strike_rate_pct': share((mates['strike_rate'] < row['strike_rate']).sum(), len(mates)),
+            'economy_rate_pct': share((bowlers['economy_rate'] > row['economy_rate']).sum(), len(bowlers))
+                                if row['economy_rate'] > 0 else 0.0,
+            'skill_rating_pct': skill,
+            'base_price_pct': share((mates['base_price'] < row['base_price']).sum(), len(mates)),
+            'value_score': round(100 * (skill if len(mates) < 2 else
+                                        (mates['skill_rating'] < row['skill_rating']).sum() / (len(mates) - 1))
+                                 / row['base_price'], 4),
+        }
+    return pd.DataFrame.from_dict(out, orient='index')
+
+def test_role_percentiles():
+    print("Testing Role Percentiles...")
+    remove_test_db()
+    db.init_db()
+    n = 300
+    db.bulk_import(pd.DataFrame({
+        "name": [f"P{i}" for i in range(n)],
+        "role": ["Batsman", "Bowler", "All-rounder", "Wicketkeeper", "Bowler"] * (n // 5),
+        "strike_rate": [100 + (i * 37) % 90 for i in range(n)],
+        "economy_rate": [0.0 if i % 5 in (0, 3) else 6 + (i * 13) % 40 / 10 for i in range(n)],
+        "base_price": [20 + 10 * (i % 19) for i in range(n)],
+        "skill_rating": [1 + (i * 7) % 10 for i in range(n)],  # many ties
+    }))
+
+    def check():
+        players = db.fetch_players().set_index('id')
+        expected = role_percentiles(db.fetch_players())
+        pd.testing.assert_frame_equal(players[db.SCORE_COLUMNS], expected.loc[players.index], check_names=False)
+
+    check()
+    print("✅ Bulk import ranks every player within their role.")
+
+    newcomer = {"name": "Newcomer", "nationality": "India", "role": "Bowler", "age": 22, "matches_played": 5,
+                "strike_rate": 150.0, "economy_rate": 6.5, "base_price": 40, "skill_rating": 9}
+    db.add_player(newcomer)
+    player = db.fetch_players({'search': 'Newcomer'}).iloc[0]
+    expected = role_percentiles(db.fetch_players()).loc[player['id']]
+    assert (player[db.SCORE_COLUMNS].astype(float) == expected.astype(float)).all()
+    def drift():
+        with db.get_connection() as conn:
+            return int(conn.execute("SELECT value FROM meta WHERE key = 'percentile_drift'").fetchone()[0])
+    for i in range(int(db.PERCENTILE_DRIFT * n) + 2):
+        db.add_player({**newcomer, "name": f"Late {i}"})
+        if drift() == 0:
+            break
+    assert i < int(db.PERCENTILE_DRIFT * n) + 1
+    check()  # enough inserts drifted to trigger a full recompute
+    print("✅ Single inserts are ranked on arrival; drift triggers a recompute.")
+
+    # A batch within the drift budget ranks just its own rows
+    pair = [{**newcomer, "name": f"Pair {i}", "role": "Batsman", "strike_rate": 120.0 + i} for i in range(2)]
+    assert db.upsert_players(pair)['inserted'] == 2 and drift() == 2
+    ranked = db.fetch_players({'search': 'Pair'}).set_index('id')
+    expected = role_percentiles(db.fetch_players()).loc[ranked.index]
+    pd.testing.assert_frame_equal(ranked[db.SCORE_COLUMNS], expected, check_names=False)
+    # A bigger one re-ranks the roles it touched and leaves the budget to the rest
+    db.upsert_players([{**newcomer, "name": f"Wave {i}", "skill_rating": 1 + i % 10} for i in range(10)])
+    assert drift() == 2
+    players = db.fetch_players().set_index('id')
+    bowlers = players[players['role'] == 'Bowler'].index
+    pd.testing.assert_frame_equal(players.loc[bowlers, db.SCORE_COLUMNS],
+                                  role_percentiles(db.fetch_players()).loc[bowlers], check_names=False)
+    print("✅ Batches rank their rows, or re-rank just their roles past the budget.")
+
+    top, _ = db.fetch_players_page(sort_by='value_score', descending=True, page_size=5)
+    assert top['value_score'].is_monotonic_decreasing
+    assert top['value_score'].iloc[0] == db.fetch_players()['value_score'].max()
+    elite = db.fetch_players({'role': ['Bowler'], 'skill_rating_pct_min': 0.5})
+    assert len(elite) and (elite['skill_rating_pct'] >= 0.5).all()
+    assert db.count_players({'skill_rating_pct_min': 0.9}) == \
+        (db.fetch_players()['skill_rating_pct'] >= 0.9).sum()
+    with db.get_connection() as conn:
+        plan = [row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM players ORDER BY value_score DESC, id DESC LIMIT 5")]
+        assert any('idx_players_value_score' in step for step in plan), plan
+    print("✅ Percentiles filter and sort through their indexes.")
+    remove_test_db()
+
+def test_upsert_players():
+    print("Testing Upserts...")
+    remove_test_db()
+    db.init_db()
+    feed = pd.DataFrame({
+        "name": [f"Feed {i}" for i in range(60)],
+        "nationality": ["India", "England", "Australia"] * 20,
+        "role": ["Batsman", "Bowler", "All-rounder", "Wicketkeeper"] * 15,
+        "economy_rate": [0.0, 7.5, 8.0, 0.0] * 15,
+        "base_price": [20 + 5 * (i % 30) for i in range(60)],
+        "skill_rating": [1 + i % 10 for i in range(60)],
+    })
+    assert db.upsert_players(feed) == {'inserted': 60, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+    assert db.upsert_players(feed) == {'inserted': 0, 'updated': 0, 'unchanged': 60, 'rejected': 0}
+    print("✅ Re-sending an unchanged feed writes nothing.")
+
+    db.simulate_auction(seed=1)
+    before = db.fetch_players().set_index('id')
+    # Tomorrow's feed: new ratings for ten players, five newcomers, two broken rows
+    changed = feed.iloc[:10].assign(skill_rating=lambda d: 11 - d['skill_rating'])
+    extra = pd.DataFrame({"name": [f"New {i}" for i in range(5)] + ["No Price", "No Role"],
+                          "nationality": ["India"] * 7, "role": ["Bowler"] * 6 + [None],
+                          "economy_rate": [6.0] * 7, "base_price": [30] * 5 + ["tbc", 30],
+                          "skill_rating": [5] * 7})
+    result = db.upsert_players(pd.concat([feed.iloc[10:], changed, extra]))
+    assert result == {'inserted': 5, 'updated': 10, 'unchanged': 50, 'rejected': 2}
+    after = db.fetch_players().set_index('id')
+    assert len(after) == 65 and after['name'].is_unique
+    assert (after.loc[before.index[:10], 'skill_rating'] == 11 - before['skill_rating'].iloc[:10]).all()
+    assert after.loc[before.index, 'auction_status'].equals(before['auction_status'])  # outcomes kept
+    stats = db.get_stats()
+    assert stats['total_players'] == 65 and stats['max_rating'] == after['skill_rating'].max()
+    assert len(db.fetch_players({'search': 'New 3'})) == 1
+    pd.testing.assert_frame_equal(after[db.SCORE_COLUMNS], role_percentiles(after.reset_index()).loc[after.index],
+                                  check_names=False)
+    print("✅ Changed players update, new ones insert, broken rows are counted and skipped.")
+
+    # A few rows are ranked one by one, matching a full recompute
+    db.upsert_players([{"name": "Feed 1", "nationality": "England", "role": "Bowler", "economy_rate": 5.0,
+                        "base_price": 200, "skill_rating": 10}])
+    edited = db.fetch_players({'search': 'Feed 1'}).set_index('name').loc['Feed 1', db.SCORE_COLUMNS]
+    db.refresh_percentiles()
+    assert edited.equals(db.fetch_players({'search': 'Feed 1'}).set_index('name').loc['Feed 1', db.SCORE_COLUMNS])
+
+    assert db.bulk_import(feed) == 60
+    assert len(db.fetch_players()) == 65
+    try:
+        db.add_player({"name": "Feed 0", "nationality": "India", "role": "Batsman", "age": 25, "matches_played": 1,
+                       "strike_rate": 120.0, "economy_rate": 0.0, "base_price": 20, "skill_rating": 5})
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert db.get_stats()['total_players'] == 65
+    print("✅ Re-importing a file merges; add_player refuses duplicates.")
+
+    # Duplicates left by imports before the unique key collapse into the oldest row
+    with db.transaction() as conn:
+        conn.execute("DROP INDEX idx_players_identity")
+        conn.execute("INSERT INTO players (name, nationality, role, base_price, skill_rating) "
+                     "VALUES ('Feed 0', 'India', 'Batsman', 90, 9)")
+        conn.execute("INSERT INTO bids (player_id, team, amount, placed_at) "
+                     "VALUES (last_insert_rowid(), 'CSK', 95, 0)")
+        conn.execute("INSERT INTO auction_events (round, kind, created_at, player_id, auction_status, final_price) "
+                     "SELECT 1, 'simulate', 0, MAX(id), 'Sold', 120 FROM players")
+        conn.execute("PRAGMA user_version = 5")
+    assert db.init_db() == db.SCHEMA_VERSION - 5
+    survivor = db.fetch_players({'search': 'Feed 0'})
+    assert len(survivor) == 1 and survivor.iloc[0]['id'] == before.index[0]
+    assert survivor.iloc[0]['base_price'] == 90 and survivor.iloc[0]['skill_rating'] == 9
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT player_id FROM bids").fetchone()[0] == before.index[0]
+        assert conn.execute("SELECT COUNT(*) FROM auction_events "
+                            "WHERE player_id NOT IN (SELECT id FROM players)").fetchone()[0] == 0
+    assert db.get_stats()['total_players'] == 65
+    print("✅ Migration merges existing duplicates.")
+    remove_test_db()
+
+def test_columnar_files():
+    print("Testing Parquet / Arrow...")
+    remove_test_db()
+    db.init_db()
+    import io
+    players = pd.DataFrame({
+        "name": [f"Col {i}" for i in range(40)], "nationality": [None, "India"] * 20,
+        "role": ["Bowler", "Batsman"] * 20, "base_price": [20 + i for i in range(40)],
+        "skill_rating": [1 + i % 10 for i in range(40)], "economy_rate": [7.5, None] * 20,
+        "scouting_notes": ["not imported"] * 40,
+    })
+    if not db.columnar_supported():
+        try:
+            db.export_players(io.BytesIO())
+            assert False, "expected ImportError"
+        except ImportError:
+            pass
+        print("⚠️ pyarrow not installed: Parquet paths raise ImportError (skipped round trip).")
+        remove_test_db()
+        return
+
+    import pyarrow as pa
+    import pyarrow.feather
+    players.iloc[:25].to_parquet("test_players.parquet", index=False, row_group_size=10)
+    arrow = io.BytesIO()
+    pa.feather.write_feather(pa.Table.from_pandas(players.iloc[25:], preserve_index=False), arrow)
+    try:
+        seen = []
+        assert db.bulk_import("test_players.parquet", chunksize=8, progress=seen.append) == 25
+        assert seen == [8, 16, 24, 25]
+        assert db.bulk_import(io.BytesIO(arrow.getvalue())) == 15  # an upload: detected by its magic bytes
+    finally:
+        os.remove("test_players.parquet")
+    stored = db.fetch_players().set_index('name').loc[players['name']]
+    assert list(stored['base_price']) == list(players['base_price'])
+    assert (stored['nationality'].iloc[::2] == 'Unknown').all()
+    assert (stored['economy_rate'].iloc[1::2] == 0.0).all()
+    print("✅ Parquet paths and Arrow uploads import in chunks with defaults.")
+
+    exported = io.BytesIO()
+    assert db.export_players(exported, {'role': ['Bowler']}) == 20
+    bowlers = pd.read_parquet(io.BytesIO(exported.getvalue()))
+    assert len(bowlers) == 20 and list(bowlers.columns) == list(db.fetch_players().columns)
+    db.simulate_auction(seed=3)
+    db.reset_auction()
+    db.simulate_auction(seed=4)
+    history = io.BytesIO()
+    written = db.export_auction_outcomes(history)
+    events = pd.read_parquet(io.BytesIO(history.getvalue()))
+    assert written == len(events) == 120  # 40 players x (simulate, reset, simulate)
+    assert events['event_id'].is_monotonic_increasing and set(events['round']) == {1, 2}
+    assert events['name'].notna().all()
+    print("✅ Filtered players and the auction history export to Parquet.")
+    remove_test_db()
+
+def test_read_replica():
+    print("Testing Read Replica...")
+    import sqlite3
+    import threading
+    import time
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(pd.DataFrame({
+        "name": [f"Rep {i}" for i in range(200)], "role": ["Bowler", "Batsman"] * 100,
+        "base_price": [20 + i for i in range(200)], "skill_rating": [1 + i % 10 for i in range(200)],
+    }))
+    newcomer = {"name": "Late Entry", "nationality": "India", "role": "Bowler", "age": 22, "matches_played": 3,
+                "strike_rate": 90.0, "economy_rate": 7.2, "base_price": 50, "skill_rating": 6}
+    try:
+        db.enable_replica(max_staleness=60)
+        assert db.count_players() == 200 and db.replica_info()['refreshes'] == 1
+        db.add_player(newcomer)
+        # Within max_staleness reads may lag, and they come from one snapshot
+        assert db.count_players() == 200 and len(db.fetch_players()) == 200
+        assert db.get_stats()['total_players'] == 200
+        with db.transaction():
+            assert db.count_players() == 201  # a writer sees its own changes
+        with db.read_connection() as conn:
+            try:
+                conn.execute("DELETE FROM players")
+                assert False, "the replica accepted a write"
+            except sqlite3.OperationalError:
+                pass
+        print("✅ Reads come from a read-only snapshot, lagging at most max_staleness.")
+
+        db.enable_replica(max_staleness=0.2)
+        db.simulate_auction(seed=1)
+        deadline = time.monotonic() + 5
+        while db.replica_info()['refreshes'] < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert db.replica_info()['refreshes'] >= 2  # refreshed in the background after the write
+        assert db.count_players() == 201 and db.get_stats()['sold_count'] > 0
+
+        # A long write in another thread neither blocks reads nor shows through half-done
+        started, finish = threading.Event(), threading.Event()
+
+        def long_write():
+            with db.transaction() as conn:
+                conn.execute("UPDATE players SET auction_status = 'Available', final_price = 0")
+                db._bump_generation(conn)
+                started.set()
+                finish.wait(5)
+
+        writer = threading.Thread(target=long_write)
+        writer.start()
+        started.wait(5)
+        time.sleep(0.3)
+        start = time.perf_counter()
+        sold = db.count_players({'auction_status': ['Sold']})
+        assert sold > 0 and time.perf_counter() - start < 1.0
+        finish.set()
+        writer.join()
+
+        db.enable_replica(max_staleness=0)
+        assert db.count_players({'auction_status': ['Sold']}) == 0  # refreshed before the read
+        print("✅ Committed writes reach readers within max_staleness; open ones never do.")
+
+        # Readers racing refreshes never open a copy that was just retired
+        errors, stop = [], threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    assert db.count_players() >= 201
+                except Exception as e:  # surfaced in the main thread
+                    errors.append(e)
+
+        readers = [threading.Thread(target=reader) for _ in range(6)]
+        for t in readers:
+            t.start()
+        refreshes = db.replica_info()['refreshes']
+        for i in range(150):
+            db.add_player({**newcomer, 'name': f"Racer {i}"})
+        stop.set()
+        for t in readers:
+            t.join()
+        assert not errors, errors[:3]
+        assert db.replica_info()['refreshes'] > refreshes
+        print("✅ Concurrent readers survive snapshot refreshes.")
+    finally:
+        db.enable_replica(False)
+    assert db.replica_info() is None
+    remove_test_db()
+
+def test_fast_start():
+    print("Testing Fast Start...")
+    import subprocess
+    import sys
+    from build_snapshot import build_snapshot
+    # Importing database.py must not pull in pandas or numpy
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, database; print('pandas' in sys.modules, 'numpy' in sys.modules)"],
+        capture_output=True, text=True, check=True).stdout.split()
+    assert loaded == ['False', 'False']
+    print("✅ database.py imports without pandas.")
+
+    remove_test_db()
+    assert build_snapshot("players.csv", TEST_DB) == len(pd.read_csv("players.csv"))
+    assert not os.path.exists(TEST_DB + "-wal")
+    assert db.init_db() == 0 and db.warm_start("players.csv") == 0
+    assert db.count_players() == len(pd.read_csv("players.csv"))
+    assert len(db.fetch_players({'search': 'Sharma'})) == 1
+    print("✅ Prebuilt snapshot opens without migrating or importing.")
+    remove_test_db()
 
 if __name__ == "__main__":
     try:
         test_database_logic()
+        test_connection_pool()
+        test_result_cache()
+        test_summary_stats()
+        test_streaming_import()
+        test_vectorized_simulation()
+        test_keyset_pagination()
+        test_chart_aggregates()
+        test_indexed_filters_at_scale()
+        test_profiling()
+        test_schema_migrations()
+        test_role_percentiles()
+        test_upsert_players()
+        test_columnar_files()
+        test_read_replica()
+        test_fast_start()
         print("\n🎉 All Professional DB tests passed!")
     except Exception as e:
         print(f"\n❌ Test Failed: {e}")
@@ -0,0 +1,124 @@
+import os
+import numpy as np
+import database as db
+import similarity
+from synthetic_players import generate_players
+
+TEST_DB = "test_similarity.db"
+
+def setup_module():
+    global _previous_db
+    _previous_db = db.DB_NAME
+    db.DB_NAME = TEST_DB
+    remove_test_db()
+    db.init_db()
+    db.bulk_import(generate_players(2000, seed=3))
+
+def teardown_module():
+    remove_test_db()
+    db.DB_NAME = _previous_db
+
+def remove_test_db():
+    db.close_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+
+def brute_force(player_id, k, filters=None):
+    """Reference: z-score the target's role, rank every player by distance."""
+    players = db.fetch_players()
+    target = players.set_index('id').loc[player_id]
+    role = players[players['role'] == target['role']]
+    raw = role[similarity.FEATURES].to_numpy(dtype=float)
+    std = raw.std(axis=0)
+    scale = np.where(std > 0, std, 1.0)
+    distance = np.sqrt((((raw - target[similarity.FEATURES].to_numpy(dtype=float)) / scale) ** 2).sum(axis=1))
+    role = role.assign(distance=distance)
+    role = role[role['id'] != player_id]
+    if filters:
+        role = role[role['auction_status'].isin(filters['auction_status'])]
+    return role.sort_values(['distance', 'id']).head(k)
+
+def test_matches_brute_force():
+    print("Testing similar players...")
+    for player_id in (1, 17, 555, 1999):
+        found = similarity.similar_players(player_id, k=8)
+        expected = brute_force(player_id, 8)
+        assert len(found) == 8
+        assert np.allclose(found['distance'], expected['distance'].round(4), atol=1e-3)
+        assert (found['role'] == expected['role'].iloc[0]).all()
+    try:
+        similarity.similar_players(99999)
+        assert False, "unknown player was accepted"
+    except ValueError:
+        pass
+    print("✅ Nearest neighbours match a brute-force scan.")
+
+def test_filters():
+    db.simulate_auction(seed=4)
+    for player_id in (3, 40):
+        for status in (['Sold'], ['Unsold']):
+            found = similarity.similar_players(player_id, k=5, filters={'auction_status': status})
+            expected = brute_force(player_id, 5, {'auction_status': status})
+            assert (found['auction_status'] == status[0]).all()
+            assert np.allclose(found['distance'], expected['distance'].round(4), atol=1e-3)
+    assert similarity.similar_players(3, filters={'auction_status': ['Available']}).empty
+    other = similarity.similar_players(3, k=20, filters={'role': ['Bowler', 'Wicketkeeper']})
+    assert set(other['role']) <= {'Bowler', 'Wicketkeeper'} and other['distance'].is_monotonic_increasing
+    db.reset_auction()
+    print("✅ Filters restrict the neighbours without losing the closest matches.")
+
+def test_incremental_updates():
+    index = similarity.get_index()
+    roles_before = dict(index.roles)
+    db.simulate_auction(seed=5)  # outcome changes leave the features alone
+    assert similarity.get_index() is index and index.roles == roles_before
+
+    clone = db.fetch_players().iloc[0].to_dict()
+    role, points = index.roles[clone['role']], index.roles[clone['role']].points
+    db.add_player({**clone, 'name': 'Twin'})
+    assert index.size == 2000 and similarity.get_index().size == 2001
+    assert len(role.new_ids) == 1 and role.points is points  # buffered, not rebuilt
+    twin = int(db.fetch_players({'search': 'Twin'})['id'].iloc[0])
+    nearest = similarity.similar_players(twin, k=1)
+    assert nearest['id'].iloc[0] == clone['id'] and nearest['distance'].iloc[0] == 0
+    db.bulk_import(generate_players(100, seed=9).assign(name=lambda d: 'New ' + d['name']))
+    assert similarity.get_index().size == 2101
+    db.reset_auction()
+    print("✅ The index picks up new players without a rebuild.")
+
+    # Rewriting a player's stats in place rebuilds the index
+    db.upsert_players([{**clone, 'matches_played': clone['matches_played'] + 40}])
+    nearest = similarity.similar_players(twin, k=1)
+    assert nearest['distance'].iloc[0] > 0
+    assert np.allclose(nearest['distance'], brute_force(twin, 1)['distance'].round(4), atol=1e-3)
+    print("✅ Upserted stats are picked up.")
+
+def test_buffer_rebuild():
+    rng = np.random.default_rng(0)
+    raw = rng.normal(50, 10, size=(130, len(similarity.FEATURES)))
+    role = similarity._RoleIndex()
+    role.extend(np.arange(100), raw[:100])
+    scale = (role.mean, role.std)
+    role.extend(np.arange(100, 110), raw[100:110])  # within REBUILD_FRACTION: buffered
+    assert len(role.ids) == 100 and len(role.new_ids) == 10 and role.mean is scale[0]
+    for target in (5, 105):
+        ids, distances = role.nearest(raw[target], 6)
+        points = (raw[:110] - scale[0]) / scale[1]
+        expected = np.sqrt(((points - points[target]) ** 2).sum(axis=1))
+        assert ids[0] == target and np.allclose(distances, np.sort(expected)[:6])
+    role.extend(np.arange(110, 130), raw[110:])  # past it: rescaled and rebuilt
+    assert len(role.ids) == 130 and len(role.new_ids) == 0
+    assert np.allclose(role.std, raw.std(axis=0))
+    print("✅ New players are buffered until the role is rebuilt.")
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_matches_brute_force()
+        test_filters()
+        test_incremental_updates()
+        test_buffer_rebuild()
+        print("\n🎉 All similarity tests passed!")
+    finally:
+        teardown_module()
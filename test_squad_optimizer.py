@@ -0,0 +1,74 @@
+import itertools
+import numpy as np
+import pandas as pd
+import squad_optimizer as so
+
+ROLES = ["Batsman", "Bowler", "All-rounder", "Wicketkeeper"]
+NATIONS = ["India", "India", "Australia", "England"]
+
+def random_pool(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "name": [f"P{i}" for i in range(n)],
+        "role": rng.choice(ROLES, n),
+        "nationality": rng.choice(NATIONS, n),
+        "skill_rating": rng.integers(1, 11, n),
+        "base_price": rng.integers(2, 21, n) * 10,
+    })
+
+def brute_force(pool, budget, size, bowlers, keepers, overseas):
+    combos = np.array(list(itertools.combinations(range(len(pool)), size)))
+    price = pool['base_price'].to_numpy()[combos].sum(axis=1)
+    is_bowler = (pool['role'] == 'Bowler').to_numpy()[combos].sum(axis=1)
+    is_keeper = (pool['role'] == 'Wicketkeeper').to_numpy()[combos].sum(axis=1)
+    is_overseas = (pool['nationality'] != 'India').to_numpy()[combos].sum(axis=1)
+    ok = (price <= budget) & (is_bowler >= bowlers) & (is_keeper >= keepers) & (is_overseas <= overseas)
+    return pool['skill_rating'].to_numpy()[combos[ok]].sum(axis=1).max() if ok.any() else None
+
+def check_rules(squad, budget, size, bowlers, keepers, overseas):
+    assert len(squad) == size and squad['id'].is_unique
+    assert squad['base_price'].sum() <= budget
+    assert (squad['role'] == 'Bowler').sum() >= bowlers
+    assert (squad['role'] == 'Wicketkeeper').sum() >= keepers
+    assert (squad['nationality'] != 'India').sum() <= overseas
+
+def test_exact_matches_brute_force():
+    print("Testing exact squad optimizer...")
+    rules = [(300, 4, 1, 1, 2), (500, 5, 2, 1, 1), (200, 3, 0, 0, 3), (700, 6, 3, 1, 0)]
+    for seed in range(20):
+        pool = random_pool(11, seed)
+        for budget, size, bowlers, keepers, overseas in rules:
+            expected = brute_force(pool, budget, size, bowlers, keepers, overseas)
+            best = so.optimize_squad(pool, budget, size, bowlers, keepers, overseas, method='exact')
+            if expected is None:
+                assert best['squad'] is None
+                continue
+            assert best['total_rating'] == expected
+            check_rules(best['squad'], budget, size, bowlers, keepers, overseas)
+            greedy = so.optimize_squad(pool, budget, size, bowlers, keepers, overseas, method='greedy')
+            if greedy['squad'] is not None:
+                check_rules(greedy['squad'], budget, size, bowlers, keepers, overseas)
+                assert greedy['total_rating'] <= expected
+    print("✅ Exact solver finds the optimum; greedy squads follow the rules.")
+
+def test_large_pool():
+    pool = random_pool(10_000, seed=1)
+    best = so.optimize_squad(pool, 1500)
+    assert best['method'] == 'exact' and best['candidates'] < 1000
+    check_rules(best['squad'], 1500, 11, 4, 1, 4)
+    # Pruning never loses the optimum
+    pruned = so.prune_candidates(pool, 11, 4)
+    assert so.optimize_squad(pruned, 1500)['total_rating'] == best['total_rating']
+    assert so.optimize_squad(pool, 100)['squad'] is None  # 11 players cost at least 220
+
+    # Very large squads switch to the heuristic
+    big = so.optimize_squad(pool, 8000, squad_size=25, min_bowlers=8, min_keepers=2, max_overseas=8)
+    assert big['method'] == 'greedy'
+    check_rules(big['squad'], 8000, 25, 8, 2, 8)
+    print("✅ 10k candidates pruned and solved; large squads fall back to greedy.")
+
+if __name__ == "__main__":
+    test_exact_matches_brute_force()
+    test_large_pool()
+    print("\n🎉 All squad optimizer tests passed!")